@@ -0,0 +1,84 @@
+"""
+Display Label and post_options: per-row apply + full zip vs display_labels + PostOptions.
+
+    python -m benchmarks.bench_display_label [--rows 100000] [--changed 200] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_engagement_rate import synthetic_posts
+from data.dataset import display_labels
+from data.post_index import PostOptions
+
+
+def apply_labels(posts: pd.DataFrame) -> pd.Series:
+    """The old normalize_posts body, kept as the reference."""
+    return posts.apply(
+        lambda r: f"{r.get('Content Type','POST')}: "
+                  f"{r['Timestamp'].strftime('%b %d, %Y') if pd.notna(r.get('Timestamp')) else 'No Date'}",
+        axis=1
+    )
+
+
+def zip_options(posts: pd.DataFrame):
+    return tuple(zip(posts["Post ID"].astype(str).tolist(), posts["Display Label"].tolist()))
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--changed", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(5)
+    posts = synthetic_posts(args.rows)
+    seconds = rng.integers(0, 3 * 365 * 86400, args.rows)
+    ts = pd.Timestamp("2022-01-01", tz="UTC") + pd.to_timedelta(seconds, unit="s")
+    posts["Timestamp"] = ts.where(rng.random(args.rows) > 0.01)
+    posts["Content Type"] = pd.array(rng.choice(["VIDEO", "IMAGE", "CAROUSEL_ALBUM"], args.rows), dtype="string")
+    posts["Post ID"] = pd.array(rng.permutation(args.rows).astype(str), dtype="string")
+    posts.index = pd.Index([f"rec{i}" for i in range(args.rows)], name="Record ID")
+
+    old_s, old = _best(lambda: apply_labels(posts), args.repeat)
+    new_s, new = _best(lambda: display_labels(posts), args.repeat)
+    assert old.equals(new), "vectorized labels differ from the per-row apply"
+    print(f"rows={args.rows:,}")
+    print(f"Display Label  apply: {old_s * 1000:8.1f} ms   display_labels: {new_s * 1000:6.1f} ms  ({old_s / new_s:,.0f}x)")
+
+    posts["Display Label"] = new
+    full_s, full = _best(lambda: zip_options(posts), args.repeat)
+
+    # A refresh where a few records changed: the builder has seen the previous load
+    changed = posts.copy()
+    rows = rng.choice(args.rows, args.changed, replace=False)
+    changed.iloc[rows, changed.columns.get_loc("Display Label")] = "VIDEO: edited"
+
+    def incremental():
+        options = PostOptions()
+        options.update(posts)
+        started = time.perf_counter()
+        out = options.update(changed)
+        return time.perf_counter() - started, out, options
+
+    runs = [incremental() for _ in range(args.repeat)]
+    inc_s, inc, builder = min(runs, key=lambda r: r[0])
+    assert inc == zip_options(changed), "incremental options differ from a full rebuild"
+    print(f"post_options   zip:   {full_s * 1000:8.1f} ms   PostOptions:    {inc_s * 1000:6.1f} ms  "
+          f"({builder.built} built, {builder.reused:,} reused)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Engagement rate: per-row apply(calculate_engagement_rate) vs add_post_kpis.
+
+    python -m benchmarks.bench_engagement_rate [--rows 100000] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data.metrics import add_post_kpis, calculate_engagement_rate
+
+
+def synthetic_posts(rows: int, seed: int = 7) -> pd.DataFrame:
+    """Posts frame shaped like the Airtable ingest: nullable Int32 counts, some zero/missing reach."""
+    rng = np.random.default_rng(seed)
+
+    def counts(high, missing=0.02):
+        values = rng.integers(0, high, rows)
+        return pd.array(np.where(rng.random(rows) < missing, None, values), dtype="Int32")
+
+    reach = rng.integers(0, 50_000, rows)
+    reach[rng.random(rows) < 0.05] = 0
+    return pd.DataFrame({
+        "Likes Count": counts(5_000),
+        "Audience Comments Count": counts(400),
+        "Saves": counts(600),
+        "Reach": pd.array(np.where(rng.random(rows) < 0.02, None, reach), dtype="Int32"),
+    })
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_posts(args.rows)
+    row_s, row_out = _best(lambda: df.apply(calculate_engagement_rate, axis=1), args.repeat)
+    vec_s, vec_out = _best(lambda: add_post_kpis(df.copy())["Engagement Rate"], args.repeat)
+
+    differing = int((row_out.to_numpy(dtype=float) != vec_out.to_numpy()).sum())
+    assert not differing, f"vectorized engagement rate differs from the per-row function on {differing} rows"
+
+    print(f"rows={args.rows:,}")
+    print(f"apply(calculate_engagement_rate): {row_s * 1000:9.1f} ms")
+    print(f"add_post_kpis:                    {vec_s * 1000:9.1f} ms  ({row_s / vec_s:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
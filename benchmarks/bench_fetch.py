@@ -0,0 +1,135 @@
+"""
+Fetch, reload and page callbacks offline, against the local Airtable stand-in.
+
+    python -m benchmarks.bench_fetch [--posts 5000] [--days 730] [--fixtures DIR] [--latency-ms 60]
+                                     [--jitter-ms 40] [--throttle 0.02] [--max-rps 0] [--touch 50]
+                                     [--repeat 3] [--app]
+
+Serves synthetic tables (or recorded fixtures) from benchmarks/fake_airtable.py
+and times, through the real pyairtable client: a full fetch of every
+field, the same fetch with the configured field projection, an
+incremental refresh after --touch posts changed, and the pipeline build.
+With --app, main.py is imported against the stand-in and reload_data and
+the Top 5 / engagement / post search callbacks are timed as well.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fake_airtable import FakeAirtable, load_fixtures, synthesize_tables
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def _counted(fake, fn):
+    """(seconds, result, server stats) for one call."""
+    fake.reset_stats()
+    started = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - started, out, dict(fake.stats)
+
+
+def _line(label, seconds, stats, extra=""):
+    print(f"{label:<28} {seconds * 1000:9.1f} ms  {stats['requests']:4d} req  {stats['throttled']:3d}x429  "
+          f"{stats['bytes'] / 1024:9.1f} KiB{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--fixtures", help="directory of <table name>.json fixtures (default: synthesize)")
+    parser.add_argument("--latency-ms", type=float, default=60.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--throttle", type=float, default=0.02, help="fraction of requests answered with 429")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="429 past this many requests/s per base")
+    parser.add_argument("--touch", type=int, default=50, help="posts modified before the incremental refresh")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--app", action="store_true", help="also time main.reload_data and the page callbacks")
+    args = parser.parse_args()
+
+    tables = load_fixtures(args.fixtures) if args.fixtures else synthesize_tables(args.posts, args.days)
+    fake = FakeAirtable(tables, args.latency_ms, args.jitter_ms, args.throttle, args.max_rps, seed=1)
+    url = fake.start()
+    posts_table, accounts_table = list(tables)[:2]
+    os.environ.update(
+        AIRTABLE_ENDPOINT_URL=url, AIRTABLE_API_KEY="bench", AIRTABLE_BASE_ID="appBench",
+        AIRTABLE_TABLE_POSTS=posts_table, AIRTABLE_TABLE_ACCOUNTS=accounts_table,
+        SNAPSHOT_DIR=tempfile.mkdtemp(prefix="bench_fetch_"),
+    )
+
+    from data.airtable_fetch import fetch_all_tables
+    from data.config_loader import get_airtable_config
+    from data.dataset import build_dataset
+
+    cfg = get_airtable_config()
+    print(f"{url}  " + ", ".join(f"{name}: {len(records):,} records" for name, records in tables.items()))
+    print(f"latency {args.latency_ms:g}±{args.jitter_ms:g} ms, throttle {args.throttle:g}, max {args.max_rps:g} req/s")
+
+    def fetch(incremental=False, fields=None):
+        return fetch_all_tables(cfg["api_key"], cfg["base_id"], cfg["tables"], incremental=incremental,
+                                max_concurrency=cfg["max_concurrency"], fields=fields)
+
+    full_s, (full, full_stats), full_srv = _counted(fake, fetch)
+    _line("full fetch, every field", full_s, full_srv)
+    proj_s, (projected, proj_stats), proj_srv = _counted(fake, lambda: fetch(fields=cfg["fields"]))
+    _line("full fetch, projected", proj_s, proj_srv, f"  ({1 - proj_srv['bytes'] / full_srv['bytes']:.0%} fewer bytes)")
+    for key, df in projected.items():
+        assert proj_stats[key]["error"] is None, proj_stats[key]["error"]
+        assert len(df) == len(full[key]), f"{key}: projected fetch returned {len(df)} rows, expected {len(full[key])}"
+        assert df.equals(full[key][df.columns]), f"{key}: projected columns differ from the full fetch"
+
+    touched = fake.touch(posts_table, args.touch)
+    inc_s, (incremental, inc_stats), inc_srv = _counted(fake, lambda: fetch(True, cfg["fields"]))
+    _line("incremental refresh", inc_s, inc_srv, f"  ({args.touch} posts touched)")
+    assert inc_stats["ig_posts"]["mode"] == "incremental", inc_stats["ig_posts"]
+    assert incremental["ig_posts"].index.isin(touched).sum() == len(touched)
+    assert len(incremental["ig_posts"]) == len(projected["ig_posts"])
+
+    build_s, ds = _best(lambda: build_dataset({k: df.copy() for k, df in projected.items()}), 1)
+    print(f"{'build_dataset, cold':<28} {build_s * 1000:9.1f} ms")
+    rebuild_s, _ = _best(lambda: build_dataset({k: df.copy() for k, df in incremental.items()}), 1)
+    print(f"{'build_dataset, after touch':<28} {rebuild_s * 1000:9.1f} ms")
+
+    if args.app:
+        _bench_app(fake, posts_table, args)
+    fake.stop()
+
+
+def _bench_app(fake, posts_table, args):
+    import main as app
+
+    app.start_data_load()
+    app.REFRESH.submit(lambda: None)[0].result()  # joins the initial load
+    print(f"{'main: initial load':<28} posts={len(app.dataset.posts_data):,} {app.dataset.error_message}")
+
+    def reload():
+        future, _ = app.REFRESH.submit(app._refresh_dataset)  # what reload_data starts
+        future.result()
+
+    fake.touch(posts_table, args.touch, seed=2)
+    reload_s, _, srv = _counted(fake, reload)
+    _line("main: reload_data", reload_s, srv, f"  ({args.touch} posts touched)")
+
+    for label, fn in (
+        ("recompute_agg", app.recompute_agg),
+        ("recompute_top_posts", app.recompute_top_posts),
+        ("_search_page 'voce'", lambda: app._search_page(app.dataset, "voce", 0)),
+    ):
+        app.VIEW_CACHE.invalidate(())  # drop the cached views: a miss
+        app.VIEW_CACHE.invalidate((app.dataset.posts_fingerprint, app.dataset.accounts_fingerprint))
+        miss_s, _ = _best(fn, 1)
+        hit_s, _ = _best(fn, args.repeat)
+        print(f"{'main: ' + label:<28} {miss_s * 1000:9.2f} ms miss  {hit_s * 1000:7.3f} ms hit")
+
+
+if __name__ == "__main__":
+    main()
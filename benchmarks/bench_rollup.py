@@ -0,0 +1,78 @@
+"""
+Engagement over time: copy + to_datetime + groupby per change vs DailyRollup queries.
+
+    python -m benchmarks.bench_rollup [--rows 100000] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_engagement_rate import synthetic_posts
+from data.rollup import DailyRollup
+
+
+def groupby_engagement(posts: pd.DataFrame, start, end, granularity: str) -> pd.DataFrame:
+    """The old recompute_agg body, kept as the reference."""
+    df = posts.copy()
+    df["__dt"] = pd.to_datetime(df["Timestamp"], errors="coerce")
+    df = df.dropna(subset=["__dt"])
+    if start:
+        df = df[df["__dt"].dt.date >= start]
+    if end:
+        df = df[df["__dt"].dt.date <= end]
+    if granularity == "Week":
+        key = df["__dt"].dt.to_period("W").apply(lambda p: p.start_time.date())
+    else:
+        key = df["__dt"].dt.date
+    group = df.groupby(key).agg(
+        {"Likes Count": "sum", "Audience Comments Count": "sum", "Saves": "sum", "Reach": "sum"}
+    ).reset_index()
+    group = group.rename(columns={group.columns[0]: "Date"})
+    group["Engagement Rate"] = (
+        (group["Likes Count"] + group["Audience Comments Count"] + group["Saves"])
+        / group["Reach"].replace(0, pd.NA)
+    ) * 100
+    group["Engagement Rate"] = group["Engagement Rate"].fillna(0).round(2)
+    return group[["Date", "Engagement Rate"]]
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    posts = synthetic_posts(args.rows)
+    seconds = rng.integers(0, 3 * 365 * 86400, args.rows)
+    posts["Timestamp"] = pd.Timestamp("2022-01-01", tz="UTC") + pd.to_timedelta(seconds, unit="s")
+
+    build_s, rollup = _best(lambda: DailyRollup(posts), args.repeat)
+    start, end = pd.Timestamp("2022-03-15").date(), pd.Timestamp("2024-06-30").date()
+
+    print(f"rows={args.rows:,}  rollup build: {build_s * 1000:.1f} ms (once per load)")
+    for gran in ("Day", "Week"):
+        old_s, old = _best(lambda: groupby_engagement(posts, start, end, gran), args.repeat)
+        new_s, new = _best(lambda: rollup.engagement_over_time(start, end, gran), args.repeat)
+        assert list(old["Date"]) == list(new["Date"]), f"{gran}: bucket dates differ"
+        diff = np.abs(old["Engagement Rate"].to_numpy(dtype=float) - new["Engagement Rate"].to_numpy())
+        assert (diff <= 0.01 + 1e-9).all(), f"{gran}: engagement rate diverges"
+        print(f"{gran:5} groupby: {old_s * 1000:8.1f} ms   rollup: {new_s * 1000:6.2f} ms  ({old_s / new_s:,.0f}x)")
+
+    month_s, _ = _best(lambda: rollup.engagement_over_time(start, end, "Month"), args.repeat)
+    print(f"Month rollup: {month_s * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
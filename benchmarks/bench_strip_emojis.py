@@ -0,0 +1,112 @@
+"""
+Emoji stripping: the original per-character loop vs the str.translate table in data.hook_nlp.
+
+Times both on a synthetic Instagram-caption corpus, then checks that they
+give identical output for that corpus and for every Unicode codepoint.
+
+    python -m benchmarks.bench_strip_emojis [--captions 20000] [--repeat 3]
+"""
+import argparse
+import random
+import sys
+import unicodedata
+import time
+
+from data.hook_nlp import _emoji_table, _strip_emojis
+
+WORDS = (
+    "você sabia que o amor não é só sentimento como cuidar da relação "
+    "por que a gente briga tanto o que fazer quando ele some "
+    "how to keep your relationship strong why we fight what you need to know "
+    "dica de hoje salva esse post e manda pra quem precisa"
+).split()
+EMOJIS = [
+    "❤️", "🔥", "😍", "🙏🏽", "👇", "✨", "💬", "🤔", "😂", "💔",
+    "👨‍👩‍👧", "🧑🏻‍🤝‍🧑🏾", "🇧🇷", "🇺🇸", "☀️", "✅", "⭐", "➡️", "©", "™",
+]
+
+
+def reference_strip(text: str) -> str:
+    """The original per-character loop, verbatim."""
+    if not isinstance(text, str) or not text:
+        return ""
+    out = []
+    for ch in text:
+        cp = ord(ch)
+        if (
+            0x1F300 <= cp <= 0x1FAFF
+            or 0x2600 <= cp <= 0x26FF
+            or 0x2700 <= cp <= 0x27BF
+            or 0xFE00 <= cp <= 0xFE0F
+            or 0x1F1E6 <= cp <= 0x1F1FF
+            or cp == 0x200D
+        ):
+            continue
+        if unicodedata.category(ch) == "So":
+            continue
+        out.append(ch)
+    return "".join(out)
+
+
+def synthetic_captions(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    captions = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(8, 40)):
+            r = rng.random()
+            if r < 0.25:
+                parts.append(rng.choice(EMOJIS) * rng.randint(1, 3))
+            elif r < 0.3:
+                parts.append("#" + rng.choice(WORDS))
+            else:
+                parts.append(rng.choice(WORDS).capitalize() if rng.random() < 0.1 else rng.choice(WORDS))
+        captions.append(" ".join(parts) + rng.choice(["", "?", "!", " 👉 link na bio"]))
+    return captions
+
+
+def check_equivalence(captions):
+    for cp in range(sys.maxunicode + 1):
+        ch = chr(cp)
+        if _strip_emojis(ch) != reference_strip(ch):
+            raise AssertionError(f"codepoint U+{cp:04X} differs")
+    for text in captions:
+        if _strip_emojis(text) != reference_strip(text):
+            raise AssertionError(f"caption differs: {text!r}")
+
+
+def _best(fn, captions, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in captions:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--captions", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    captions = synthetic_captions(args.captions)
+    started = time.perf_counter()
+    _emoji_table()
+    build_s = time.perf_counter() - started
+    first_s = _best(_strip_emojis, captions, 1)  # fills in the characters the corpus uses
+
+    ref_s = _best(reference_strip, captions, args.repeat)
+    fast_s = _best(_strip_emojis, captions, args.repeat)
+    check_equivalence(captions)
+    chars = sum(len(c) for c in captions)
+    print(f"captions={len(captions):,} chars={chars:,} (identical output, all codepoints checked)")
+    print(f"table build (once):   {build_s * 1000:8.1f} ms")
+    print(f"first pass:           {first_s * 1000:8.1f} ms")
+    print(f"per-character loop:   {ref_s * 1000:8.1f} ms")
+    print(f"str.translate table:  {fast_s * 1000:8.1f} ms  ({ref_s / fast_s:,.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
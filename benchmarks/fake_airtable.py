@@ -0,0 +1,464 @@
+"""
+Local Airtable stand-in: serves record pages from fixtures or synthetic data.
+
+    python -m benchmarks.fake_airtable serve [--port 8787] [--posts 5000] [--days 730] [--fixtures DIR]
+                                             [--latency-ms 0] [--jitter-ms 0] [--throttle 0] [--max-rps 0]
+    python -m benchmarks.fake_airtable synth --out DIR [--posts 5000] [--days 730]
+    python -m benchmarks.fake_airtable record --out DIR
+
+Point the dashboard (or any benchmark) at it with
+AIRTABLE_ENDPOINT_URL=http://127.0.0.1:8787; any AIRTABLE_API_KEY and
+AIRTABLE_BASE_ID will do. It answers the list-records calls the sync makes:
+GET /v0/{base}/{table} and POST /v0/{base}/{table}/listRecords, with
+pageSize/offset paging, fields[] projection (422 on unknown fields) and
+the "modified since" filterByFormula of data/airtable_fetch.py.
+Every request can be delayed (--latency-ms, --jitter-ms) and answered
+with a 429, either at random (--throttle, a fraction of requests) or
+past a per-base request rate (--max-rps, Airtable's is 5). GET /_stats
+returns the request, 429, record and byte counts so far.
+
+`record` saves the live tables (credentials from get_airtable_config) as
+fixtures, one JSON list of records per table, so a benchmark can replay
+real data offline with --fixtures.
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import yaml
+
+from data.airtable_fetch import WATERMARK_FIELD
+from data.config_loader import YAML_PATH
+
+PAGE_SIZE = 100  # Airtable's maximum (and default) page size
+_FORMULA = re.compile(r"^NOT\(IS_BEFORE\(\{(?P<field>[^}]+)\}, DATETIME_PARSE\('(?P<at>[^']+)'\)\)\)$")
+_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+# Hook openers as they show up on the account: Portuguese and English, emojis included
+_HOOKS_PT = [
+    "Por que você {verb} {thing}? {emoji}",
+    "{n} erros que {who} comete ao {action}",
+    "Ninguém te conta isso sobre {thing} {emoji}",
+    "O segredo para {action} sem {pain}",
+    "Pare de {verb} {thing} agora {emoji}",
+    "Como eu aprendi a {action} em {n} dias",
+    "Você sente isso também? {emoji}",
+    "A verdade sobre {thing} que ninguém fala",
+]
+_HOOKS_EN = [
+    "Why you {verb} {thing}? {emoji}",
+    "{n} mistakes {who} make when they {action}",
+    "Nobody tells you this about {thing} {emoji}",
+    "The secret to {action} without {pain}",
+    "Stop {verb} {thing} right now {emoji}",
+    "How I learned to {action} in {n} days",
+    "Do you feel this too? {emoji}",
+    "The truth about {thing} nobody talks about",
+]
+_WORDS = {
+    "pt": {
+        "verb": ["procrastina", "esquece", "evita", "ama", "ignora"],
+        "thing": ["sua rotina", "o amor próprio", "a ansiedade", "seus sonhos", "o seu corpo", "a maternidade"],
+        "who": ["mães", "iniciantes", "criadores", "casais"],
+        "action": ["crescer no Instagram", "organizar a semana", "dormir melhor", "se amar", "economizar"],
+        "pain": ["culpa", "estresse", "gastar muito", "perder tempo"],
+    },
+    "en": {
+        "verb": ["procrastinate on", "forget", "avoid", "love", "ignore"],
+        "thing": ["your routine", "self-love", "anxiety", "your dreams", "your body", "motherhood"],
+        "who": ["moms", "beginners", "creators", "couples"],
+        "action": ["grow on Instagram", "plan your week", "sleep better", "love yourself", "save money"],
+        "pain": ["guilt", "stress", "overspending", "wasting time"],
+    },
+}
+_EMOJIS = ["🚀", "❤️", "✨", "😱", "🙏", "🔥", "💡", "😍", ""]
+_HASHTAGS = ["#maternidade", "#autocuidado", "#rotina", "#selflove", "#momlife", "#dicas", "#motivation"]
+
+
+def _iso(ts: datetime) -> str:
+    return ts.strftime(_TIME_FORMAT)
+
+
+def _parse_time(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+
+
+def table_names() -> Dict[str, str]:
+    """Table key -> Airtable table name, as configured for the default base."""
+    with YAML_PATH.open("r") as f:
+        cfg = yaml.safe_load(f) or {}
+    tables = (cfg.get("bases", {}).get("malugo_backend") or {}).get("tables", {})
+    return {
+        "ig_posts": (tables.get("ig_posts_comments") or {}).get("name", "IG Posts and Comments"),
+        "ig_accounts": (tables.get("ig_account_metrics") or {}).get("name", "IG Account Metrics"),
+    }
+
+
+def hook_text(rng: random.Random) -> str:
+    lang = "pt" if rng.random() < 0.6 else "en"
+    template = rng.choice(_HOOKS_PT if lang == "pt" else _HOOKS_EN)
+    words = {name: rng.choice(options) for name, options in _WORDS[lang].items()}
+    return template.format(n=rng.randint(3, 7), emoji=rng.choice(_EMOJIS), **words).strip()
+
+
+def synthesize_posts(n: int, days: int = 730, seed: int = 7,
+                     end: datetime = datetime(2024, 10, 1, tzinfo=timezone.utc)) -> List[dict]:
+    """
+    `n` post records over the `days` before `end`, newest last, shaped like
+    the live table: Portuguese/English hooks, heavy-tailed reach, likes,
+    saves and comments as fractions of reach, watch time on videos and a
+    caption the dashboard does not read.
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    offsets = np.sort(np_rng.integers(0, days * 86400, n))
+    reach = np.round(np_rng.lognormal(np.log(2500), 1.1, n)).astype(int)
+    like_rate = np_rng.beta(2, 30, n)
+    records = []
+    for i in range(n):
+        posted = end - timedelta(days=days) + timedelta(seconds=int(offsets[i]))
+        kind = rng.choices(["VIDEO", "IMAGE", "CAROUSEL_ALBUM"], weights=[55, 25, 20])[0]
+        hook = hook_text(rng) if rng.random() > 0.03 else None
+        fields = {
+            "Post ID": str(17841400000000000 + i),
+            "Timestamp": _iso(posted),
+            "Content Type": kind,
+            "Likes Count": int(reach[i] * like_rate[i]),
+            "Reach": int(reach[i]) if rng.random() > 0.02 else 0,
+            "Saves": int(reach[i] * like_rate[i] * rng.uniform(0.02, 0.3)),
+            "Audience Comments Count": int(reach[i] * like_rate[i] * rng.uniform(0.01, 0.1)),
+            "Caption": " ".join(filter(None, [hook, hook_text(rng), hook_text(rng)] + rng.sample(_HASHTAGS, 3))),
+            WATERMARK_FIELD: _iso(min(end, posted + timedelta(hours=rng.randint(1, 72)))),
+        }
+        if hook is not None:
+            fields["Hook Text"] = hook
+        if kind == "VIDEO":
+            fields["Average Watch Time"] = round(rng.uniform(1.5, 25.0), 2)
+        records.append({"id": f"recP{i:013d}", "createdTime": fields["Timestamp"], "fields": fields})
+    return records
+
+
+def synthesize_accounts(days: int = 730, seed: int = 7,
+                        end: datetime = datetime(2024, 10, 1, tzinfo=timezone.utc)) -> List[dict]:
+    """One account-metrics record per day for the `days` before `end`, followers growing."""
+    rng = random.Random(seed)
+    followers, views = 12_000, 0
+    records = []
+    for i in range(days):
+        day = end - timedelta(days=days - i)
+        followers += rng.randint(-20, 80)
+        views += rng.randint(50, 900)
+        fields = {
+            "Date": day.strftime("%Y-%m-%d"),
+            "Reach": rng.randint(1_000, 40_000),
+            "Lifetime Follower Count": followers,
+            "Lifetime Profile Views": views,
+            WATERMARK_FIELD: _iso(day + timedelta(hours=23)),
+        }
+        records.append({"id": f"recA{i:013d}", "createdTime": fields[WATERMARK_FIELD], "fields": fields})
+    return records
+
+
+def synthesize_tables(posts: int, days: int, seed: int = 7) -> Dict[str, List[dict]]:
+    names = table_names()
+    return {
+        names["ig_posts"]: synthesize_posts(posts, days, seed),
+        names["ig_accounts"]: synthesize_accounts(days, seed),
+    }
+
+
+def save_fixtures(directory, tables: Dict[str, List[dict]]):
+    """One `<table name>.json` (a list of records) per table."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, records in tables.items():
+        with (directory / f"{name}.json").open("w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+
+
+def load_fixtures(directory) -> Dict[str, List[dict]]:
+    tables = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        with path.open("r", encoding="utf-8") as f:
+            tables[path.stem] = json.load(f)
+    return tables
+
+
+def record_fixtures(directory) -> Dict[str, int]:
+    """Save every record (all fields) of the configured live tables as fixtures."""
+    from data.airtable_fetch import get_api
+    from data.config_loader import get_airtable_config
+
+    cfg = get_airtable_config()
+    api = get_api(cfg["api_key"])
+    tables = {name: api.table(cfg["base_id"], name).all() for name in cfg["tables"].values()}
+    save_fixtures(directory, tables)
+    return {name: len(records) for name, records in tables.items()}
+
+
+class _AirtableError(Exception):
+    def __init__(self, status: int, kind: str, message: str):
+        super().__init__(message)
+        self.status, self.kind = status, kind
+
+
+class FakeAirtable:
+    """
+    The list-records part of the Airtable API over in-memory tables.
+
+    Pages are cut from a fixed record order, so an offset token stays valid
+    while other requests come and go; a filtered listing is computed once
+    per formula and table version and then paged like the full one.
+    """
+
+    def __init__(self, tables: Dict[str, List[dict]], latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 throttle: float = 0.0, max_rps: float = 0.0, retry_after: Optional[int] = None, seed: int = 0):
+        self.tables = {name: list(records) for name, records in tables.items()}
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.throttle = throttle
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._versions = {name: 0 for name in self.tables}
+        self._filtered: Dict[tuple, List[dict]] = {}
+        self._recent: Dict[str, deque] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.reset_stats()
+
+    # ---- lifecycle -----------------------------------------------------
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on a background thread; returns the endpoint URL (port 0 picks a free one)."""
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-airtable", daemon=True)
+        self._thread.start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "throttled": 0, "records": 0, "bytes": 0}
+
+    # ---- data ----------------------------------------------------------
+    def touch(self, table: str, n: int, at: Optional[datetime] = None, seed: int = 0) -> List[str]:
+        """Mark `n` random records of `table` as modified (Updated At = `at`, default now)."""
+        stamp = _iso(at or datetime.now(timezone.utc))
+        with self._lock:
+            records = self.tables[table]
+            picked = random.Random(seed).sample(range(len(records)), min(n, len(records)))
+            for i in picked:
+                records[i] = {**records[i], "fields": {**records[i]["fields"], WATERMARK_FIELD: stamp}}
+            self._versions[table] += 1
+        return [records[i]["id"] for i in picked]
+
+    def _listing(self, table: str, formula: Optional[str]) -> List[dict]:
+        with self._lock:
+            records = self.tables.get(table)
+            if records is None:
+                raise _AirtableError(404, "TABLE_NOT_FOUND", f"Could not find table {table}")
+            if not formula:
+                return records
+            key = (table, formula, self._versions[table])
+            listing = self._filtered.get(key)
+        if listing is not None:
+            return listing
+
+        match = _FORMULA.match(formula.strip())
+        since = _parse_time(match.group("at")) if match else None
+        if since is None:
+            raise _AirtableError(422, "INVALID_FILTER_BY_FORMULA", f"Unsupported formula: {formula}")
+        field = match.group("field")
+        listing = []
+        for record in records:
+            value = _parse_time(record["fields"].get(field) or "")
+            if value is not None and value >= since:
+                listing.append(record)
+        with self._lock:
+            self._filtered[key] = listing
+        return listing
+
+    def list_records(self, table: str, options: dict) -> dict:
+        listing = self._listing(table, options.get("filterByFormula"))
+        page_size = int(options.get("pageSize") or PAGE_SIZE)
+        if not 1 <= page_size <= PAGE_SIZE:
+            raise _AirtableError(422, "INVALID_REQUEST_UNKNOWN", f"pageSize must be 1..{PAGE_SIZE}")
+        try:
+            start = int(options.get("offset") or 0)
+        except ValueError:
+            raise _AirtableError(422, "LIST_RECORDS_ITERATOR_NOT_AVAILABLE", "Invalid offset")
+
+        fields = options.get("fields")
+        page = listing[start:start + page_size]
+        if fields is not None:
+            records = self.tables[table]
+            known = {name for record in records[:1000] for name in record["fields"]}
+            unknown = [name for name in fields if name not in known]
+            if unknown and records:
+                raise _AirtableError(422, "UNKNOWN_FIELD_NAME", f'Unknown field name: "{unknown[0]}"')
+            wanted = set(fields)
+            page = [{**r, "fields": {k: v for k, v in r["fields"].items() if k in wanted}} for r in page]
+
+        body = {"records": page}
+        if start + page_size < len(listing):
+            body["offset"] = str(start + page_size)
+        return body
+
+    # ---- HTTP ----------------------------------------------------------
+    def _throttled(self, base: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self.throttle and self._rng.random() < self.throttle:
+                return True
+            if not self.max_rps:
+                return False
+            recent = self._recent.setdefault(base, deque())
+            while recent and now - recent[0] >= 1.0:
+                recent.popleft()
+            if len(recent) >= self.max_rps:
+                return True
+            recent.append(now)
+            return False
+
+    def _delay(self):
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, as the client's session expects
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: Optional[dict] = None):
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+                with fake._lock:
+                    fake.stats["bytes"] += len(payload)
+                    fake.stats["records"] += len(body.get("records", ()))
+
+            def _serve(self, options: dict):
+                parts = [unquote(p) for p in urlparse(self.path).path.strip("/").split("/")]
+                if parts == ["_stats"]:
+                    with fake._lock:
+                        stats = dict(fake.stats)
+                    return self._send(200, stats)
+                if len(parts) not in (3, 4) or parts[0] != "v0" or parts[3:] not in ([], ["listRecords"]):
+                    return self._send(404, {"error": "NOT_FOUND"})
+
+                with fake._lock:
+                    fake.stats["requests"] += 1
+                throttled = fake._throttled(parts[1])  # rate counted on arrival, as Airtable does
+                fake._delay()
+                if throttled:
+                    with fake._lock:
+                        fake.stats["throttled"] += 1
+                    headers = {} if fake.retry_after is None else {"Retry-After": str(fake.retry_after)}
+                    return self._send(429, {"errors": [{"error": "RATE_LIMIT_REACHED",
+                                                        "message": "Rate limit exceeded. Please try again later"}]},
+                                      headers)
+                try:
+                    self._send(200, fake.list_records(parts[2], options))
+                except _AirtableError as e:
+                    self._send(e.status, {"error": {"type": e.kind, "message": str(e)}})
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                options = {name: values[-1] for name, values in query.items() if name != "fields[]"}
+                if "fields[]" in query:
+                    options["fields"] = query["fields[]"]
+                self._serve(options)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                self._serve(body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="serve fixtures or synthetic tables")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8787)
+    serve.add_argument("--fixtures", help="directory of <table name>.json fixtures (default: synthesize)")
+    serve.add_argument("--latency-ms", type=float, default=0.0)
+    serve.add_argument("--jitter-ms", type=float, default=0.0)
+    serve.add_argument("--throttle", type=float, default=0.0, help="fraction of requests answered with 429")
+    serve.add_argument("--max-rps", type=float, default=0.0, help="429 past this many requests/s per base")
+    serve.add_argument("--retry-after", type=int, help="Retry-After seconds sent with a 429")
+    synth = commands.add_parser("synth", help="write synthetic tables as fixtures")
+    synth.add_argument("--out", required=True)
+    for sub in (serve, synth):
+        sub.add_argument("--posts", type=int, default=5_000)
+        sub.add_argument("--days", type=int, default=730)
+        sub.add_argument("--seed", type=int, default=7)
+    record = commands.add_parser("record", help="save the live Airtable tables as fixtures")
+    record.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        for name, count in record_fixtures(args.out).items():
+            print(f"{name}: {count:,} records")
+        return
+    if args.command == "synth":
+        tables = synthesize_tables(args.posts, args.days, args.seed)
+        save_fixtures(args.out, tables)
+        for name, records in tables.items():
+            print(f"{name}: {len(records):,} records")
+        return
+
+    tables = load_fixtures(args.fixtures) if args.fixtures else synthesize_tables(args.posts, args.days, args.seed)
+    fake = FakeAirtable(tables, args.latency_ms, args.jitter_ms, args.throttle, args.max_rps, args.retry_after)
+    url = fake.start(args.host, args.port)
+    for name, records in tables.items():
+        print(f"{name}: {len(records):,} records")
+    print(f"Serving on {url}  (AIRTABLE_ENDPOINT_URL={url})")
+    try:
+        fake._thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,366 @@
+from __future__ import annotations
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib3.util.retry import Retry
+
 from pyairtable import Api
+import numpy as np
 import pandas as pd
+import requests
+
+from data.schema import TABLE_SCHEMAS, FrameBuilder
+
+# Last-modified field used as the incremental sync watermark.
+WATERMARK_FIELD = "Updated At"
+# Frames are indexed by Airtable record id so incremental updates can be merged.
+RECORD_ID = "Record ID"
+
+# (base_id, table_name) -> (raw frame, watermark, field projection) from the last successful sync
+_SYNC_CACHE: Dict[Tuple[str, str], Tuple[pd.DataFrame, Optional[str], Optional[List[str]]]] = {}
+_SYNC_LOCK = threading.Lock()
+# Airtable has no cheap row count, so deletions are found by listing every
+# live id. That pass pages the whole table; it runs on every Nth incremental
+# sync of a table (and on the first one after seeding from a snapshot).
+DELETE_CHECK_EVERY = max(1, int(os.getenv("AIRTABLE_DELETE_CHECK_EVERY", 8)))
+# (base_id, table_name) -> incremental syncs since deletions were last checked
+_SINCE_DELETE_CHECK: Dict[Tuple[str, str], int] = {}
+
+# Airtable allows 5 requests per second per base; requests are started a
+# little under that, since the server counts them on arrival.
+AIRTABLE_RATE_LIMIT = 5
+REQUEST_RATE = 4.5
+DEFAULT_MAX_CONCURRENCY = 4
+# Retried by the HTTP session with exponential, jittered backoff (Retry-After honoured on 503).
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+# 429s are retried by _ThrottledApi instead, so the retry waits its turn
+# with the base's other requests and holds them back as well.
+THROTTLE_RETRIES = 6
+THROTTLE_BACKOFF = 0.5
+# Where API requests go; point it at a stand-in (benchmarks/fake_airtable.py) to work offline.
+DEFAULT_ENDPOINT_URL = "https://api.airtable.com"
+
+
+class _BaseLimiter:
+    """Caps in-flight requests and spaces request starts for one base."""
+
+    def __init__(self, max_concurrency: int, rate: float = REQUEST_RATE):
+        self.max_concurrency = max_concurrency
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self._interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait_turn(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+    def hold(self, seconds: float):
+        """Start no request for this base in the next `seconds` (after a 429)."""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+_LIMITERS: Dict[str, _BaseLimiter] = {}
+_APIS: Dict[Tuple[str, str], Api] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def _limiter_for(base_id: str, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> _BaseLimiter:
+    max_concurrency = max(1, min(int(max_concurrency), AIRTABLE_RATE_LIMIT))
+    with _CLIENT_LOCK:
+        limiter = _LIMITERS.get(base_id)
+        if limiter is None or limiter.max_concurrency != max_concurrency:
+            limiter = _LIMITERS[base_id] = _BaseLimiter(max_concurrency)
+        return limiter
+
+
+class _TransportRetry(Retry):
+    # urllib3 would otherwise retry a 429 carrying Retry-After by itself
+    RETRY_AFTER_STATUS_CODES = frozenset({413, 503})
+
+
+def _throttle_delay(response: Optional[requests.Response], attempt: int) -> float:
+    """Seconds to wait before retrying a 429: Retry-After if given, else jittered exponential backoff."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return THROTTLE_BACKOFF * 2 ** attempt + random.uniform(0, THROTTLE_BACKOFF)
+
+
+class _ThrottledApi(Api):
+    """Api whose requests, and their retries after a 429, go through the per-base limiter."""
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlparse(url).path.strip("/").split("/")
+        base_id = parts[1] if len(parts) > 1 else ""
+        with _CLIENT_LOCK:
+            limiter = _LIMITERS.get(base_id)
+        if limiter is None:
+            return super().request(method, url, *args, **kwargs)
+        for attempt in range(THROTTLE_RETRIES + 1):
+            with limiter.slots:
+                limiter.wait_turn()
+                try:
+                    return super().request(method, url, *args, **kwargs)
+                except requests.HTTPError as e:
+                    status = getattr(e.response, "status_code", None)
+                    if status != 429 or attempt == THROTTLE_RETRIES:
+                        raise
+                    delay = _throttle_delay(e.response, attempt)
+            limiter.hold(delay)
+
+
+def get_api(api_key: str, endpoint_url: Optional[str] = None) -> Api:
+    """Shared client (one HTTP session / connection pool) per API key and endpoint (AIRTABLE_ENDPOINT_URL)."""
+    endpoint_url = (endpoint_url or os.getenv("AIRTABLE_ENDPOINT_URL") or DEFAULT_ENDPOINT_URL).rstrip("/")
+    with _CLIENT_LOCK:
+        api = _APIS.get((api_key, endpoint_url))
+        if api is None:
+            retry = _TransportRetry(
+                status_forcelist=RETRY_STATUS_CODES,
+                allowed_methods=None,
+                backoff_factor=0.5,
+                backoff_jitter=0.5,
+                total=6,
+            )
+            api = _APIS[(api_key, endpoint_url)] = _ThrottledApi(
+                api_key, retry_strategy=retry, endpoint_url=endpoint_url
+            )
+        return api
+
+
+def _pages_to_frame(pages, schema: Optional[dict] = None) -> pd.DataFrame:
+    """Stream record pages into typed column buffers; each page is dropped once copied."""
+    builder = FrameBuilder(schema, index_name=RECORD_ID)
+    for page in pages:
+        builder.add_page(page)
+    return builder.to_frame()
+
+
+def latest_watermark(df: Optional[pd.DataFrame]) -> Optional[str]:
+    """Return the max `Updated At` of a frame as an Airtable-parsable UTC string."""
+    if df is None or df.empty or WATERMARK_FIELD not in df.columns:
+        return None
+    s = pd.to_datetime(df[WATERMARK_FIELD], errors="coerce", utc=True).dropna()
+    if s.empty:
+        return None
+    # Truncated to the second; the filter below is inclusive so nothing is lost.
+    return s.max().strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
 
-def fetch_airtable_data(api_key: str, base_id: str, table_name: str):
-    """Fetch all rows from an Airtable table using the modern pyairtable API."""
-    api = Api(api_key)
+def modified_since_formula(watermark: str) -> str:
+    return f"NOT(IS_BEFORE({{{WATERMARK_FIELD}}}, DATETIME_PARSE('{watermark}')))"
+
+
+def _differing(before: pd.DataFrame, after: pd.DataFrame) -> np.ndarray:
+    """Mask of the rows of `after` whose values differ from the same rows of `before`."""
+    differs = np.zeros(len(after), dtype=bool)
+    for name in after.columns:
+        a, b = before[name], after[name]
+        same = (a == b).fillna(False).to_numpy(dtype=bool) | (a.isna() & b.isna()).to_numpy(dtype=bool)
+        differs |= ~same
+    return differs
+
+
+def merge_records(cached: pd.DataFrame, changed: pd.DataFrame,
+                  live_ids: Optional[Iterable[str]] = None) -> Tuple[pd.DataFrame, pd.Index]:
+    """
+    Upsert `changed` into `cached` by record id and drop ids no longer in Airtable.
+
+    Updated records keep their row position and only new ids are appended,
+    so a refresh that re-returns unchanged records (the watermark second is
+    fetched again) leaves the frame, and its fingerprint, as it was. Returns
+    (merged frame, ids of the records that really changed or are new).
+    Without `live_ids`, no record is dropped.
+
+    Airtable leaves empty fields out of a record, so a changed record
+    replaces its whole row: cached columns it lacks become NA. `cached`
+    must hold only requested fields (see project_fields).
+    """
+    merged = cached if live_ids is None else cached[cached.index.isin(pd.Index(list(live_ids)))]
+    if changed.empty:
+        return merged, changed.index
+    if merged.empty:
+        return changed, changed.index
+
+    cleared = [name for name in merged.columns if name not in changed.columns]
+    if cleared:
+        # No changed record has these fields: they are empty in all of them
+        changed = changed.assign(**{name: merged[name].iloc[:0].reindex(changed.index) for name in cleared})
+    missing = [name for name in changed.columns if name not in merged.columns]
+    if missing:
+        # Typed like the incoming column, empty for the rows already held
+        merged = merged.assign(**{name: changed[name].iloc[:0].reindex(merged.index) for name in missing})
+    known = changed.index.isin(merged.index)
+    updates, new = changed[known], changed[~known]
+    if len(updates):
+        updates = updates[_differing(merged.loc[updates.index, updates.columns], updates)]
+    if len(updates):
+        merged = merged.copy()
+        merged.loc[updates.index, updates.columns] = updates
+    if len(new):
+        merged = pd.concat([merged, new])
+    return merged, updates.index.append(new.index)
+
+
+def project_fields(df: pd.DataFrame, fields: Optional[List[str]]) -> pd.DataFrame:
+    """Drop columns outside a field projection (e.g. from a snapshot taken before it)."""
+    if fields is None:
+        return df
+    return df[[c for c in df.columns if c in fields]]
+
+
+def fields_cover(have: Optional[List[str]], want: Optional[List[str]]) -> bool:
+    """True when a frame fetched with projection `have` holds every field of `want` (None = every field)."""
+    if have is None:
+        return True
+    return want is not None and set(want) <= set(have)
+
+
+def fetch_airtable_data(api_key: str, base_id: str, table_name: str, schema: Optional[dict] = None,
+                        fields: Optional[List[str]] = None):
+    """Fetch all rows (only `fields`, if given) from an Airtable table using the modern pyairtable API."""
+    api = get_api(api_key)
     table = api.table(base_id, table_name)
 
-    records = table.all()
-    if not records:
-        return pd.DataFrame()
+    return _pages_to_frame(table.iterate(fields=fields), schema)
+
 
-    df = pd.DataFrame([r["fields"] for r in records])
-    return df
+def _sync_table(api_key: str, base_id: str, table_name: str, incremental: bool, schema: Optional[dict] = None,
+                fields: Optional[List[str]] = None):
+    """
+    Fetch a table, reusing the previous sync when possible; returns (frame, mode).
 
-def fetch_all_tables(api_key: str, base_id: str, tables: dict):
-    """Fetch multiple tables and return as a dictionary of dataframes."""
-    result = {}
-    for key, table_name in tables.items():
+    With a cached frame and watermark, only records whose `Updated At` is at or
+    after the watermark are pulled and upserted by record id. Every
+    DELETE_CHECK_EVERY syncs, a second pass that requests just the watermark
+    field lists live ids so deletions are dropped.
+    Without them (first run, `incremental=False`, or a table lacking the field)
+    this is a full fetch that seeds the cache. With `fields`, only those
+    fields are requested (Airtable's `fields[]` parameter).
+    """
+    key = (base_id, table_name)
+    with _SYNC_LOCK:
+        cached, watermark, cached_fields = _SYNC_CACHE.get(key, (None, None, None))
+
+    table = get_api(api_key).table(base_id, table_name)
+    live_ids = None
+    # A cache fetched without some of the requested fields can't be topped up incrementally
+    if not incremental or cached is None or watermark is None or not fields_cover(cached_fields, fields):
+        mode = "full"
+        df = _pages_to_frame(table.iterate(fields=fields), schema)
+    else:
+        mode = "incremental"
+        with _SYNC_LOCK:
+            check_deletes = _SINCE_DELETE_CHECK.get(key, 0) + 1 >= DELETE_CHECK_EVERY
+        changed_pages = table.iterate(formula=modified_since_formula(watermark), fields=fields)
+        if check_deletes:
+            # Airtable pages are offset-chained, so parallelism within a table is
+            # limited to running the changed-records and live-ids passes together.
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                changed_f = pool.submit(_pages_to_frame, changed_pages, schema)
+                ids_f = pool.submit(
+                    lambda: [r["id"] for page in table.iterate(fields=[WATERMARK_FIELD]) for r in page]
+                )
+                changed = changed_f.result()
+                live_ids = ids_f.result()
+        else:
+            changed, live_ids = _pages_to_frame(changed_pages, schema), None
+        if fields != cached_fields:
+            cached = project_fields(cached, fields)
+        df, changed_ids = merge_records(cached, changed, live_ids)
+        deleted = "not checked" if live_ids is None else int((~cached.index.isin(live_ids)).sum())
+        print(f"Incremental sync {table_name}: {len(changed_ids)} changed, deleted {deleted}")
+
+    with _SYNC_LOCK:
+        _SYNC_CACHE[key] = (df, latest_watermark(df), fields)
+        _SINCE_DELETE_CHECK[key] = 0 if live_ids is not None or mode == "full" else _SINCE_DELETE_CHECK.get(key, 0) + 1
+    # Callers normalise columns in place; keep the cached copy pristine.
+    return df.copy(), mode
+
+
+def seed_sync_cache(base_id: str, table_name: str, df: pd.DataFrame, watermark: Optional[str],
+                    fields: Optional[List[str]] = None):
+    """Prime the incremental sync with a frame loaded from elsewhere (e.g. a local snapshot) holding `fields`."""
+    with _SYNC_LOCK:
+        _SYNC_CACHE[(base_id, table_name)] = (df, watermark, fields)
+        # The snapshot may predate deletions: check on the next incremental sync
+        _SINCE_DELETE_CHECK[(base_id, table_name)] = DELETE_CHECK_EVERY - 1
+
+
+def _cached_copy(base_id: str, table_name: str) -> pd.DataFrame:
+    with _SYNC_LOCK:
+        cached = _SYNC_CACHE.get((base_id, table_name), (None, None, None))[0]
+    return cached.copy() if cached is not None else pd.DataFrame()
+
+
+def fetch_all_tables(
+    api_key: str,
+    base_id: str,
+    tables: dict,
+    incremental: bool = False,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    only: Optional[Iterable[str]] = None,
+    fields: Optional[Dict[str, Optional[List[str]]]] = None,
+):
+    """
+    Fetch multiple tables concurrently.
+
+    Returns (frames, stats): a dictionary of dataframes and, per table key,
+    {"seconds", "rows", "mode", "error"}. At most `max_concurrency` requests
+    (capped at Airtable's per-base limit) are in flight for the base. A table
+    that fails keeps its last synced frame (or an empty one) and reports the
+    error in its stats. Columns declared in TABLE_SCHEMAS for a key are typed
+    during ingestion. With `only`, just those keys are fetched; the other
+    tables come from the sync cache with mode "cached". `fields` maps a key
+    to its field projection; keys without one fetch every field.
+    """
+    fields = fields or {}
+    _limiter_for(base_id, max_concurrency)
+
+    def _one(key, table_name):
+        started = time.perf_counter()
         try:
-            df = fetch_airtable_data(api_key, base_id, table_name)
-            result[key] = df
+            df, mode = _sync_table(
+                api_key, base_id, table_name, incremental, TABLE_SCHEMAS.get(key), fields.get(key)
+            )
+            error = None
         except Exception as e:
             print(f"Error fetching {table_name}: {e}")
-            result[key] = pd.DataFrame()
-    return result
+            df, mode, error = _cached_copy(base_id, table_name), "failed", str(e)
+        return df, {
+            "seconds": round(time.perf_counter() - started, 3),
+            "rows": len(df),
+            "mode": mode,
+            "error": error,
+        }
+
+    result, stats = {}, {}
+    if only is not None:
+        only = set(only)
+        for key, table_name in tables.items():
+            if key not in only:
+                result[key] = _cached_copy(base_id, table_name)
+                stats[key] = {"seconds": 0.0, "rows": len(result[key]), "mode": "cached", "error": None}
+        tables = {key: name for key, name in tables.items() if key in only}
+    if not tables:
+        return result, stats
+    with ThreadPoolExecutor(max_workers=len(tables), thread_name_prefix="airtable") as pool:
+        futures = {key: pool.submit(_one, key, table_name) for key, table_name in tables.items()}
+        for key, future in futures.items():
+            result[key], stats[key] = future.result()
+    return result, stats
+
+
+def fetch_errors(stats: dict) -> str:
+    """One-line summary of failed tables from `fetch_all_tables` stats ("" if none)."""
+    return "; ".join(f"{key}: {s['error']}" for key, s in stats.items() if s.get("error"))
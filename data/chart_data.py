@@ -0,0 +1,43 @@
+# data/chart_data.py
+# Slim frames for the charts (only the plotted columns) and the decimator
+# that thins long time series before they are sent to the browser.
+from __future__ import annotations
+import os
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+from taipy.gui.data.decimator import LTTB
+
+# Max points per chart trace sent to the browser; zooming in re-fetches the
+# visible range at the same budget, so detail comes back as the range narrows.
+CHART_POINT_BUDGET = int(os.getenv("CHART_POINT_BUDGET", 500))
+
+
+class TimeSeriesLTTB(LTTB):
+    """
+    LTTB for traces with datetime x values.
+
+    Taipy's LTTB does its triangle arithmetic on the raw (x, y) rows, which
+    fails for Timestamps; x is mapped to epoch nanoseconds first and missing
+    y values count as 0. The mask it returns keeps first and last points.
+    """
+
+    def decimate(self, data: np.ndarray, payload) -> np.ndarray:
+        x = pd.to_datetime(pd.Series(data[:, 0]), errors="coerce", utc=True)
+        x = x.astype("int64").to_numpy(dtype=np.float64)
+        y = pd.to_numeric(pd.Series(data[:, 1]), errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+        return super().decimate(np.column_stack([x, y]), payload)
+
+
+def chart_decimator(budget: int = CHART_POINT_BUDGET) -> TimeSeriesLTTB:
+    """Decimator kicking in above `budget` points and reapplied on zoom."""
+    return TimeSeriesLTTB(n_out=max(3, budget), threshold=budget, zoom=True)
+
+
+def chart_frame(df: pd.DataFrame, x: str, ys: Sequence[str]) -> pd.DataFrame:
+    """Just the plotted columns, sorted by x, without rows lacking x (what LTTB expects)."""
+    columns = [x] + [y for y in ys if y in df.columns]
+    if df.empty or x not in df.columns:
+        return pd.DataFrame(columns=columns)
+    return df[columns].dropna(subset=[x]).sort_values(x, kind="stable").reset_index(drop=True)
@@ -2,10 +2,33 @@
 from __future__ import annotations
 import os, yaml
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from data.schema import TABLE_SCHEMAS
 
 YAML_PATH = Path(__file__).resolve().parents[1] / "config" / "airtable_config.yaml"
 
+def _fields(env_name: str, table_cfg: Dict[str, Any]) -> Optional[List[str]]:
+    """Field projection for a table (env wins, comma-separated); None = every field."""
+    env = (os.getenv(env_name) or "").strip()
+    fields = env.split(",") if env else (table_cfg or {}).get("fields")
+    if not fields:
+        return None
+    return [str(f).strip() for f in fields if str(f).strip()] or None
+
+
+def _check_projection(key: str, fields: Optional[List[str]], where: str):
+    """Fail on a projection that leaves out fields the pages read (the TABLE_SCHEMAS columns)."""
+    if fields is None:
+        return
+    missing = [name for name in TABLE_SCHEMAS.get(key, {}) if name not in fields]
+    if missing:
+        raise ValueError(
+            f"Airtable config: {where} leaves out fields the dashboard reads: {', '.join(missing)}. "
+            "Add them or remove the list to fetch every field."
+        )
+
+
 def get_airtable_config() -> Dict[str, Any]:
     with YAML_PATH.open("r") as f:
         cfg = yaml.safe_load(f) or {}
@@ -24,6 +47,20 @@ def get_airtable_config() -> Dict[str, Any]:
     tbl_posts = os.getenv("AIRTABLE_TABLE_POSTS", (t_cfg.get("ig_posts_comments") or {}).get("name", "")).strip()
     tbl_accounts = os.getenv("AIRTABLE_TABLE_ACCOUNTS", (t_cfg.get("ig_account_metrics") or {}).get("name", "")).strip()
 
+    # Max in-flight Airtable requests for the base (Airtable allows 5 req/s per base)
+    max_concurrency = int(os.getenv("AIRTABLE_MAX_CONCURRENCY") or base_cfg.get("max_concurrency") or 4)
+
+    # Auto-refresh interval per table in minutes (env wins); 0 or unset = manual refresh only
+    refresh_posts = float(os.getenv("AIRTABLE_REFRESH_MINUTES_POSTS") or (t_cfg.get("ig_posts_comments") or {}).get("refresh_minutes") or 0)
+    refresh_accounts = float(os.getenv("AIRTABLE_REFRESH_MINUTES_ACCOUNTS") or (t_cfg.get("ig_account_metrics") or {}).get("refresh_minutes") or 0)
+    max_refresh_backoff = int(base_cfg.get("max_refresh_backoff") or 8)
+
+    # Field projection per table: only these fields are requested from Airtable
+    fields_posts = _fields("AIRTABLE_FIELDS_POSTS", t_cfg.get("ig_posts_comments"))
+    fields_accounts = _fields("AIRTABLE_FIELDS_ACCOUNTS", t_cfg.get("ig_account_metrics"))
+    _check_projection("ig_posts", fields_posts, "tables.ig_posts_comments.fields (or AIRTABLE_FIELDS_POSTS)")
+    _check_projection("ig_accounts", fields_accounts, "tables.ig_account_metrics.fields (or AIRTABLE_FIELDS_ACCOUNTS)")
+
     missing = []
     if not api_key:       missing.append("AIRTABLE_API_KEY")
     if not base_id:       missing.append("AIRTABLE_BASE_ID or bases.<alias>.base_id")
@@ -40,4 +77,14 @@ def get_airtable_config() -> Dict[str, Any]:
             "ig_accounts": tbl_accounts,
         },
         "alias": alias,
+        "max_concurrency": max_concurrency,
+        "refresh_intervals": {
+            "ig_posts": refresh_posts * 60,
+            "ig_accounts": refresh_accounts * 60,
+        },
+        "max_refresh_backoff": max_refresh_backoff,
+        "fields": {
+            "ig_posts": fields_posts,
+            "ig_accounts": fields_accounts,
+        },
     }
@@ -0,0 +1,377 @@
+# data/dataset.py
+# Everything the pages show for one data load, built off the UI thread and
+# published with a single reference swap.
+from __future__ import annotations
+import hashlib
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.chart_data import chart_frame
+from data.hook_nlp import HookCorpus, build_hook_corpus
+from data.leaderboard import Leaderboard
+from data.metrics import add_post_kpis, nz
+from data.post_index import PostIndex, PostOptions
+from data.post_search import PostSearch
+from data.rollup import DailyRollup
+from data.schema import TextStore, compact_frame, frame_bytes
+
+_VERSIONS = itertools.count(1)
+
+
+class Deferred:
+    """A value computed once, on the first get() from any thread; later calls share it."""
+
+    def __init__(self, fn: Callable, *args):
+        self._fn = fn
+        self._args = args
+        self._value = None
+        self._done = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, value) -> "Deferred":
+        d = cls(lambda: value)
+        d._value, d._done = value, True
+        return d
+
+    @property
+    def ready(self) -> bool:
+        return self._done
+
+    def get(self):
+        if not self._done:
+            with self._lock:
+                if not self._done:
+                    self._value = self._fn(*self._args)
+                    self._done = True
+                    self._fn = self._args = None
+        return self._value
+
+
+class Dataset(NamedTuple):
+    """
+    One immutable data load. Frames are shared by every session and must be
+    treated as read-only; per-session views (filters, selections) copy them.
+    """
+    version: int
+    account_data: pd.DataFrame
+    posts_data: pd.DataFrame
+    post_texts: TextStore  # long text fields split off posts_data (Hook Text), decoded on demand
+    post_options: Tuple[Tuple[str, str], ...]
+    post_index: PostIndex
+    post_search: PostSearch  # paged type-ahead over labels and hooks, for the post selector
+    hook_corpus: Deferred  # HookCorpus, built when the Semantics page first needs it
+    current_followers: int = 0
+    latest_reach: int = 0
+    profile_views: int = 0
+    total_posts: int = 0
+    total_likes: int = 0
+    date_min: str = ""  # YYYY-MM-DD of the oldest post
+    date_max: str = ""  # YYYY-MM-DD of the newest post
+    updated_at: Optional[pd.Timestamp] = None  # latest "Updated At" across tables (UTC)
+    error_message: str = ""
+    daily_rollup: Optional[DailyRollup] = None  # engagement sums per day, for recompute_agg
+    # Chart-only frames: just the plotted columns (see data/chart_data.py)
+    engagement_points: Optional[pd.DataFrame] = None
+    growth_points: Optional[pd.DataFrame] = None
+    reach_by_day: Optional[pd.DataFrame] = None
+    leaderboard: Optional[Leaderboard] = None  # top posts per metric, for the Top 5 table
+    # Fingerprints of the raw tables; views derived from one table are cached under its own
+    posts_fingerprint: str = ""
+    accounts_fingerprint: str = ""
+
+
+EMPTY_DATASET = Dataset(
+    version=0,
+    account_data=pd.DataFrame(columns=["Date", "Reach", "Lifetime Follower Count"]),
+    posts_data=pd.DataFrame(columns=["Post ID", "Likes Count", "Reach", "Saves", "Timestamp"]),
+    post_texts=TextStore(),
+    post_options=(),
+    post_index=PostIndex(),
+    post_search=PostSearch(),
+    hook_corpus=Deferred.of(HookCorpus([], {})),
+    daily_rollup=DailyRollup(),
+    engagement_points=pd.DataFrame(columns=["Timestamp", "Engagement Rate"]),
+    growth_points=pd.DataFrame(columns=["Date", "Reach", "Lifetime Follower Count"]),
+    reach_by_day=pd.DataFrame(columns=["Day", "Reach"]),
+    leaderboard=Leaderboard(),
+)
+
+
+def latest_updated_at(*frames: pd.DataFrame) -> Optional[pd.Timestamp]:
+    """Most recent Airtable modification time across frames, or None."""
+    candidates = []
+    for df in frames:
+        if df is None or df.empty:
+            continue
+        col = next((c for c in ("Updated At", "Updated_at", "updated_at") if c in df.columns), None)
+        if col:
+            s = pd.to_datetime(df[col], errors="coerce", utc=True).dropna()
+            if not s.empty:
+                candidates.append(s.max())
+    return max(candidates) if candidates else None
+
+
+def frame_fingerprint(df: Optional[pd.DataFrame]) -> str:
+    """Content hash of a frame (index, columns, dtypes and values)."""
+    h = hashlib.sha1()
+    if df is None:
+        return ""
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df.index.to_series(), index=False).values.tobytes())
+    for name in df.columns:
+        col = df[name]
+        try:
+            hashed = pd.util.hash_pandas_object(col, index=False)
+        except TypeError:
+            # Airtable list fields (links, attachments) aren't hashable
+            hashed = pd.util.hash_pandas_object(col.astype(str), index=False)
+        h.update(hashed.values.tobytes())
+    return h.hexdigest()[:16]
+
+
+# -------------------------------
+# Stages
+# -------------------------------
+def normalize_accounts(raw: pd.DataFrame) -> pd.DataFrame:
+    if raw.empty or "Date" not in raw.columns:
+        return raw
+    accounts = raw.sort_values("Date")
+    accounts["Day"] = accounts["Date"].dt.day_name()
+    return accounts
+
+
+def normalize_posts(raw: pd.DataFrame) -> pd.DataFrame:
+    if raw.empty:
+        return raw
+    # Column types come from the declared schema (data/schema.py)
+    if "Timestamp" in raw.columns:
+        posts = raw.sort_values("Timestamp", ascending=False)
+    else:
+        posts = raw.copy()
+
+    posts = add_post_kpis(posts)
+
+    if "Display Label" not in posts.columns:
+        posts["Display Label"] = display_labels(posts)
+    return posts
+
+
+def display_labels(posts: pd.DataFrame) -> pd.Series:
+    """"<Content Type>: <Mon DD, YYYY>" per post; each distinct day is formatted once."""
+    dates = np.full(len(posts), "No Date", dtype=object)
+    if "Timestamp" in posts.columns:
+        codes, days = pd.factorize(posts["Timestamp"].dt.floor("D"))  # NaT -> -1
+        if len(days):
+            dated = codes >= 0
+            dates[dated] = np.asarray(days.strftime("%b %d, %Y"), dtype=object)[codes[dated]]
+    kinds = posts["Content Type"].astype(str) if "Content Type" in posts.columns else "POST"
+    return kinds + ": " + pd.Series(dates, index=posts.index)
+
+
+def normalize_table(key: str, normalize: Callable, raw: pd.DataFrame) -> Tuple[pd.DataFrame, TextStore, Dict[str, int]]:
+    """normalize(raw) stored compactly (see COMPACT_SCHEMAS), its text store, and their sizes in bytes."""
+    frame = normalize(raw)
+    compact, texts = compact_frame(frame, key)
+    return compact, texts, {"before": frame_bytes(frame), "after": frame_bytes(compact), "text_store": texts.nbytes}
+
+
+def _fmt_bytes(n: int) -> str:
+    return f"{n / 1e6:.1f} MB" if abs(n) >= 1e6 else f"{n / 1e3:.0f} kB"
+
+
+def memory_report(sizes: Dict[str, Dict[str, int]]) -> str:
+    """Bytes per table before/after compaction, e.g. for the load log."""
+    parts = []
+    for key, size in sizes.items():
+        saved = size["before"] - size["after"] - size["text_store"]
+        parts.append(
+            f"{key} {_fmt_bytes(size['before'])} -> {_fmt_bytes(size['after'])} "
+            f"+ {_fmt_bytes(size['text_store'])} text ({_fmt_bytes(saved)} saved)"
+        )
+    return "; ".join(parts)
+
+
+def derive_posts(posts: pd.DataFrame, options: PostOptions) -> Tuple[Tuple[Tuple[str, str], ...], PostIndex]:
+    """(post_options, PostIndex) for the post selector."""
+    return options.update(posts), PostIndex(posts)
+
+
+def derive_post_charts(posts: pd.DataFrame) -> pd.DataFrame:
+    return chart_frame(posts, "Timestamp", ["Engagement Rate"])
+
+
+def derive_account_charts(accounts: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """(growth line points, reach-by-weekday bar rows)."""
+    growth = chart_frame(accounts, "Date", ["Reach", "Lifetime Follower Count"])
+    if "Day" in accounts.columns and "Reach" in accounts.columns:
+        by_day = accounts[["Day", "Reach"]].reset_index(drop=True)
+    else:
+        by_day = pd.DataFrame(columns=["Day", "Reach"])
+    return growth, by_day
+
+
+def aggregate_accounts(accounts: pd.DataFrame) -> dict:
+    if accounts.empty or "Date" not in accounts.columns:
+        return {}
+    last = accounts.iloc[-1]
+    return {
+        "current_followers": int(nz(last.get("Lifetime Follower Count", 0))),
+        "latest_reach": int(nz(last.get("Reach", 0))),
+        "profile_views": int(nz(last.get("Lifetime Profile Views", 0))),
+    }
+
+
+def aggregate_posts(posts: pd.DataFrame) -> dict:
+    if posts.empty:
+        return {}
+    fields = {"total_posts": len(posts)}
+    if "Likes Count" in posts.columns:
+        fields["total_likes"] = int(pd.to_numeric(posts["Likes Count"], errors="coerce").fillna(0).sum())
+    try:
+        if "Timestamp" in posts.columns:
+            _dt = posts["Timestamp"].dropna()
+            if len(_dt) > 0:
+                fields["date_min"] = str(_dt.min().date())
+                fields["date_max"] = str(_dt.max().date())
+    except Exception as _e:
+        print("Date range init error:", _e)
+    return fields
+
+
+def render_hook_corpus(posts: pd.DataFrame, texts: TextStore) -> HookCorpus:
+    return build_hook_corpus(texts.attach(posts))
+
+
+class DataPipeline:
+    """
+    Fetched tables -> Dataset in stages: normalize, derive, aggregate, render.
+    Normalized tables are stored compactly (data/schema.py COMPACT_SCHEMAS)
+    and the bytes this saves are logged per table. The render stage (hook
+    corpus) is deferred: it only runs, NLTK loading included, once
+    something asks for the corpus.
+
+    Each stage keeps its last output together with the fingerprint of the
+    raw table it came from, and is skipped when that fingerprint repeats. A
+    refresh where only account metrics changed therefore reuses the posts
+    frame, post index and hook corpus as they are. Fetching is the caller's
+    stage; its duration can be passed in so one line logs the whole run.
+    """
+
+    def __init__(self):
+        self._memo: Dict[str, Tuple[str, object]] = {}
+        self._lock = threading.Lock()
+        self.timings: Dict[str, object] = {}
+        self.memory: Dict[str, Dict[str, int]] = {}
+        self._post_options = PostOptions()
+
+    def _stage(self, name: str, fingerprint: str, fn: Callable, *args):
+        memo = self._memo.get(name)
+        if memo is not None and memo[0] == fingerprint:
+            self.timings[name] = "cached"
+            return memo[1]
+        started = time.perf_counter()
+        out = fn(*args)
+        self.timings[name] = round(time.perf_counter() - started, 3)
+        self._memo[name] = (fingerprint, out)
+        return out
+
+    def build(self, all_data: Dict[str, pd.DataFrame], error_message: str = "",
+              fetch_seconds: Optional[float] = None) -> Dataset:
+        with self._lock:
+            self.timings = {} if fetch_seconds is None else {"fetch": round(fetch_seconds, 3)}
+            raw_accounts = all_data.get("ig_accounts", pd.DataFrame())
+            raw_posts = all_data.get("ig_posts", pd.DataFrame())
+            started = time.perf_counter()
+            fp_accounts = frame_fingerprint(raw_accounts)
+            fp_posts = frame_fingerprint(raw_posts)
+            self.timings["fingerprint"] = round(time.perf_counter() - started, 3)
+
+            accounts, _, self.memory["ig_accounts"] = self._stage(
+                "normalize.accounts", fp_accounts, normalize_table, "ig_accounts", normalize_accounts, raw_accounts
+            )
+            posts, post_texts, self.memory["ig_posts"] = self._stage(
+                "normalize.posts", fp_posts, normalize_table, "ig_posts", normalize_posts, raw_posts
+            )
+            post_options, post_index = self._stage("derive.posts", fp_posts, derive_posts, posts, self._post_options)
+            post_search = self._stage("derive.post_search", fp_posts, PostSearch, posts, post_options, post_texts)
+            engagement_points = self._stage("derive.post_charts", fp_posts, derive_post_charts, posts)
+            leaderboard = self._stage("derive.leaderboard", fp_posts, Leaderboard, posts)
+            growth_points, reach_by_day = self._stage(
+                "derive.account_charts", fp_accounts, derive_account_charts, accounts
+            )
+            account_fields = self._stage("aggregate.accounts", fp_accounts, aggregate_accounts, accounts)
+            post_fields = self._stage("aggregate.posts", fp_posts, aggregate_posts, posts)
+            daily_rollup = self._stage("aggregate.rollup", fp_posts, DailyRollup, posts)
+            hook_corpus = self._stage("render.hook_corpus", fp_posts, Deferred, render_hook_corpus, posts, post_texts)
+            print("Pipeline timings:", self.timings)
+            print("Memory:", memory_report(self.memory))
+
+        return Dataset(
+            version=next(_VERSIONS),
+            account_data=accounts,
+            posts_data=posts,
+            post_texts=post_texts,
+            post_options=post_options,
+            post_index=post_index,
+            post_search=post_search,
+            hook_corpus=hook_corpus,
+            updated_at=latest_updated_at(accounts, posts),
+            error_message=error_message,
+            daily_rollup=daily_rollup,
+            engagement_points=engagement_points,
+            growth_points=growth_points,
+            reach_by_day=reach_by_day,
+            leaderboard=leaderboard,
+            posts_fingerprint=fp_posts,
+            accounts_fingerprint=fp_accounts,
+            **account_fields,
+            **post_fields,
+        )
+
+
+PIPELINE = DataPipeline()
+
+
+def build_dataset(all_data: Dict[str, pd.DataFrame], error_message: str = "",
+                  fetch_seconds: Optional[float] = None) -> Dataset:
+    """Derive everything the dashboard shows from freshly fetched raw tables."""
+    return PIPELINE.build(all_data, error_message, fetch_seconds)
+
+
+class SingleFlight:
+    """
+    Runs one job at a time on a background thread.
+
+    A submit while a job is in flight does not queue another run when the
+    pending job covers its `scope` (the keys it works on, None for all);
+    the caller gets that future instead, so repeated clicks coalesce into
+    it. A wider job is queued behind the running one.
+    """
+
+    def __init__(self, name: str):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._jobs: List[Tuple[Future, Optional[FrozenSet]]] = []  # not done yet, oldest first
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, scope: Optional[Iterable] = None) -> Tuple[Future, bool]:
+        """(future, started): started is False when joining a job already pending."""
+        scope = None if scope is None else frozenset(scope)
+        with self._lock:
+            self._jobs = [(f, s) for f, s in self._jobs if not f.done()]
+            for future, covered in reversed(self._jobs):
+                if covered is None or (scope is not None and scope <= covered):
+                    return future, False
+            future = self._executor.submit(fn, *args)
+            self._jobs.append((future, scope))
+            return future, True
+
+    def running(self) -> bool:
+        with self._lock:
+            return any(not f.done() for f, _ in self._jobs)
@@ -0,0 +1,543 @@
+# data/hook_nlp.py
+# Hook text tokenization for the Semantics page
+# (emoji stripping + EN lemmatization + custom remove list), with a token cache.
+from __future__ import annotations
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data.metrics import HOOK_METRICS, hook_metric_values
+from data.snapshot import SNAPSHOT_DIR
+from data.worker_pool import worker_context
+
+
+# NLTK is imported, its corpora checked/downloaded and the lemmatizer built
+# on the first hook that actually needs tagging (see _ensure_nltk), so
+# importing this module, and pages that never show hooks, stay cheap.
+_LEMMATIZER = None
+_NLTK_LOCK = threading.Lock()
+
+
+def _ensure_nltk():
+    global _LEMMATIZER
+    if _LEMMATIZER is not None:
+        return
+    with _NLTK_LOCK:
+        if _LEMMATIZER is not None:
+            return
+        import nltk
+        from nltk.data import find
+        from nltk.stem import WordNetLemmatizer
+
+        # wordnet for English lemmatization
+        try:
+            find("corpora/wordnet")
+        except LookupError:
+            nltk.download("wordnet", quiet=True)
+
+        # wordnet multi-lingual index (often used by wordnet)
+        try:
+            find("corpora/omw-1.4")
+        except LookupError:
+            nltk.download("omw-1.4", quiet=True)
+
+        # POS tagger for better lemmatization
+        try:
+            find("taggers/averaged_perceptron_tagger")
+        except LookupError:
+            nltk.download("averaged_perceptron_tagger", quiet=True)
+
+        _LEMMATIZER = WordNetLemmatizer()
+
+
+# nltk.corpus.wordnet POS constants, without importing NLTK
+_WN_NOUN, _WN_VERB, _WN_ADJ, _WN_ADV = "n", "v", "a", "r"
+
+# REMOVE: articles, most prepositions, generic linking/filler
+REMOVE_WORDS = set([
+    # Portuguese articles/determiners
+    "a", "o", "as", "os", "um", "uma", "uns", "umas",
+    "ao", "aos", "à", "às", "da", "das", "do", "dos",
+    "no", "na", "nos", "nas",
+    "num", "numa", "nuns", "numas",
+
+    # Portuguese prepositions (most)
+    "de", "em", "para", "pra", "com", "por", "sem", "sobre", "entre", "até",
+    "contra", "desde", "perante", "após", "antes", "durante",
+
+    # Generic linking/filler
+    "e", "ou", "mas", "porém", "pois", "então", "daí", "assim", "tipo", "né", "eh", "aí", "ai",
+
+    # English articles/prepositions/linkers
+    "the", "a", "an",
+    "to", "of", "in", "on", "for", "with", "from", "by", "at", "into", "onto", "over", "under",
+    "between", "through", "during", "before", "after", "without", "against", "about", "around",
+    "and", "or", "but", "so", "then",
+])
+
+# KEEP: pronouns + question words + hook-critical
+KEEP_WORDS = set([
+    # Portuguese pronouns/direct address
+    "você", "vocês", "vc", "vcs", "eu", "nós",
+
+    # Portuguese question words / forms
+    "como", "quando", "onde", "qual", "quais", "quem", "que", "quê",
+    "por_que", "o_que", "pra_que", "para_que",
+
+    # English pronouns/question words
+    "you", "your", "i", "we", "my", "me", "our",
+    "why", "how", "what", "when", "where", "which", "who",
+])
+
+QUESTION_PHRASES = {
+    ("por", "que"): "por_que",
+    ("o", "que"): "o_que",
+    ("pra", "que"): "pra_que",
+    ("para", "que"): "para_que",
+}
+
+# Emoji blocks, dingbats, variation selectors, regional indicators and ZWJ;
+# every other "So" (Symbol, other) character is stripped as well.
+_EMOJI_RANGES = (
+    (0x1F300, 0x1FAFF),
+    (0x2600, 0x26FF),
+    (0x2700, 0x27BF),
+    (0xFE00, 0xFE0F),
+    (0x1F1E6, 0x1F1FF),
+    (0x200D, 0x200D),
+)
+
+
+class _EmojiTable(dict):
+    """
+    str.translate table deleting the _EMOJI_RANGES and every "So" character.
+
+    Only the ranges are filled in up front; any other codepoint has its
+    category looked up the first time translate meets it and the answer
+    is kept, so the table grows with the characters captions actually use.
+    """
+
+    def __init__(self):
+        super().__init__()
+        for lo, hi in _EMOJI_RANGES:
+            self.update(dict.fromkeys(range(lo, hi + 1)))
+
+    def __missing__(self, cp: int) -> Optional[int]:
+        keep = None if unicodedata.category(chr(cp)) == "So" else cp
+        self[cp] = keep
+        return keep
+
+
+@functools.lru_cache(maxsize=1)
+def _emoji_table() -> _EmojiTable:
+    return _EmojiTable()
+
+
+def _strip_emojis(text: str) -> str:
+    if not isinstance(text, str) or not text:
+        return ""
+    return text.translate(_emoji_table())
+
+def _nltk_pos_to_wordnet(tag: str):
+    if not tag:
+        return _WN_NOUN
+    if tag.startswith("V"):
+        return _WN_VERB
+    if tag.startswith("J"):
+        return _WN_ADJ
+    if tag.startswith("R"):
+        return _WN_ADV
+    return _WN_NOUN
+
+def _fold_question_phrases(tokens):
+    out = []
+    i = 0
+    while i < len(tokens):
+        if i + 1 < len(tokens):
+            pair = (tokens[i], tokens[i + 1])
+            if pair in QUESTION_PHRASES:
+                out.append(QUESTION_PHRASES[pair])
+                i += 2
+                continue
+        out.append(tokens[i])
+        i += 1
+    return out
+
+def _should_remove(tok: str) -> bool:
+    if tok in KEEP_WORDS:
+        return False
+    return tok in REMOVE_WORDS
+
+def _is_mostly_ascii(token: str) -> bool:
+    if not token:
+        return True
+    ascii_count = sum(1 for c in token if ord(c) < 128)
+    return (ascii_count / max(1, len(token))) >= 0.9
+
+def _pre_tokens(text: str) -> List[str]:
+    """Emoji/URL stripping, regex tokens and question-phrase folding (everything before POS tagging)."""
+    if not isinstance(text, str):
+        return []
+
+    text = _strip_emojis(text).strip().lower()
+    if not text:
+        return []
+
+    text = re.sub(r"https?://\S+|www\.\S+", " ", text)
+    raw_tokens = re.findall(r"[a-zà-öø-ÿ']+", text, flags=re.IGNORECASE)
+
+    tokens = []
+    for t in raw_tokens:
+        t = t.strip("'")
+        if len(t) < 2:
+            continue
+        tokens.append(t)
+
+    if not tokens:
+        return []
+
+    return _fold_question_phrases(tokens)
+
+
+# (token, wordnet POS) -> lemma; the same pairs repeat heavily across captions
+LEMMA_MEMO_SIZE = 100_000
+_LEMMA_MEMO: Dict[tuple, str] = {}
+_LEMMA_LOCK = threading.Lock()
+LEMMA_STATS = {"lookups": 0, "lemmatizer_calls": 0}
+
+
+def _lemmatize(tok: str, pos: str) -> str:
+    key = (tok, _nltk_pos_to_wordnet(pos))
+    with _LEMMA_LOCK:
+        LEMMA_STATS["lookups"] += 1
+        lemma = _LEMMA_MEMO.get(key)
+    if lemma is not None:
+        return lemma
+    lemma = _LEMMATIZER.lemmatize(*key)
+    with _LEMMA_LOCK:
+        LEMMA_STATS["lemmatizer_calls"] += 1
+        if len(_LEMMA_MEMO) >= LEMMA_MEMO_SIZE:
+            # oldest insertion first
+            _LEMMA_MEMO.pop(next(iter(_LEMMA_MEMO)))
+        _LEMMA_MEMO[key] = lemma
+    return lemma
+
+
+def _finish_tokens(tagged) -> List[str]:
+    out = []
+    for tok, pos in tagged:
+        if tok in QUESTION_PHRASES.values():
+            out.append(tok)
+            continue
+
+        if _should_remove(tok):
+            continue
+
+        norm = tok
+        # Only English lemmatization; PT kept as-is
+        if _is_mostly_ascii(tok):
+            norm = _lemmatize(tok, pos)
+
+        if len(norm) < 2:
+            continue
+        out.append(norm)
+
+    return out
+
+
+def _tag_and_finish(token_lists: List[List[str]]) -> List[List[str]]:
+    """POS-tag all token lists in one tagger call, then filter and lemmatize."""
+    _ensure_nltk()
+    import nltk
+    try:
+        tagged = nltk.pos_tag_sents(token_lists)
+    except Exception:
+        tagged = [[(t, "") for t in tokens] for tokens in token_lists]
+    return [_finish_tokens(t) for t in tagged]
+
+
+def _tag_and_finish_worker(token_lists: List[List[str]]):
+    before = dict(LEMMA_STATS)
+    out = _tag_and_finish(token_lists)
+    return out, {k: LEMMA_STATS[k] - before[k] for k in LEMMA_STATS}
+
+
+# -------------------------------
+# Token cache
+# -------------------------------
+# Bump when the tokenization code itself changes; the word lists are hashed below.
+TOKENIZER_VERSION = 1
+
+
+def _rules_version() -> str:
+    rules = json.dumps(
+        [
+            TOKENIZER_VERSION,
+            sorted(REMOVE_WORDS),
+            sorted(KEEP_WORDS),
+            sorted(["|".join(k), v] for k, v in QUESTION_PHRASES.items()),
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(rules.encode("utf-8")).hexdigest()[:12]
+
+
+RULES_VERSION = _rules_version()
+
+
+class TokenCache:
+    """
+    LRU cache of hook tokens keyed by sha1(rules version + hook text).
+
+    Persisted as JSON so a restart (or a refresh where most hooks are
+    unchanged) skips the NLP work; a file written under different rules is
+    ignored on load.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = 50_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(f"{RULES_VERSION}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load(self):
+        self._loaded = True
+        if self.path is None or not self.path.is_file():
+            return
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Token cache unreadable ({self.path}): {e}")
+            return
+        if payload.get("rules_version") != RULES_VERSION:
+            return
+        for key, tokens in payload.get("entries", [])[-self.max_entries:]:
+            self._entries[key] = tokens
+
+    def get(self, text: str) -> Optional[List[str]]:
+        key = self.key(text)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            tokens = self._entries.get(key)
+            if tokens is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return tokens
+
+    def put(self, text: str, tokens: List[str]):
+        with self._lock:
+            self._entries[self.key(text)] = tokens
+            self._entries.move_to_end(self.key(text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def save(self):
+        """Write the cache to disk if it changed since the last save."""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"rules_version": RULES_VERSION, "entries": list(self._entries.items())}
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Token cache not saved: {e}")
+
+
+TOKEN_CACHE = TokenCache(Path(os.getenv("HOOK_TOKEN_CACHE") or SNAPSHOT_DIR / "hook_tokens.json"))
+
+
+# Above this many uncached hooks, tagging is spread over a process pool
+POOL_MIN_HOOKS = int(os.getenv("HOOK_NLP_POOL_MIN_HOOKS", 5000))
+POOL_WORKERS = int(os.getenv("HOOK_NLP_WORKERS", max(1, min(4, (os.cpu_count() or 1) - 1))))
+
+
+def _tag_in_pool(token_lists: List[List[str]]) -> List[List[str]]:
+    # Each worker loads the tagger once (see data/worker_pool.py for why not fork)
+    size = -(-len(token_lists) // POOL_WORKERS)
+    chunks = [token_lists[i:i + size] for i in range(0, len(token_lists), size)]
+    out: List[List[str]] = []
+    with ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=worker_context()) as pool:
+        for tokens, stats in pool.map(_tag_and_finish_worker, chunks):
+            out.extend(tokens)
+            with _LEMMA_LOCK:
+                for k, v in stats.items():
+                    LEMMA_STATS[k] += v
+    return out
+
+
+def tokenize_hooks(texts: List[str]) -> List[List[str]]:
+    """
+    Tokenize many hooks at once.
+
+    Cached hooks are served from TOKEN_CACHE; the remaining unique hooks are
+    POS-tagged in a single tagger call (or in a process pool for large
+    batches) and lemmatized through the (token, POS) memo.
+    """
+    results: List[Optional[List[str]]] = [None] * len(texts)
+    pending: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        if not isinstance(text, str):
+            results[i] = []
+            continue
+        if text in pending:
+            pending[text].append(i)
+            continue
+        cached = TOKEN_CACHE.get(text)
+        if cached is not None:
+            results[i] = list(cached)
+        else:
+            pending[text] = [i]
+
+    if pending:
+        uncached = list(pending)
+        pre = [_pre_tokens(t) for t in uncached]
+        todo = [i for i, tokens in enumerate(pre) if tokens]
+        token_lists = [pre[i] for i in todo]
+        # Downloads any missing corpora once, before pool workers look for them
+        _ensure_nltk()
+        if POOL_WORKERS > 1 and len(token_lists) >= POOL_MIN_HOOKS:
+            finished = _tag_in_pool(token_lists)
+        else:
+            finished = _tag_and_finish(token_lists)
+        final: List[List[str]] = [[] for _ in uncached]
+        for i, tokens in zip(todo, finished):
+            final[i] = tokens
+        for text, tokens in zip(uncached, final):
+            TOKEN_CACHE.put(text, tokens)
+            for i in pending[text]:
+                results[i] = list(tokens)
+
+    return results
+
+
+def lemma_memo_report() -> str:
+    with _LEMMA_LOCK:
+        lookups, calls = LEMMA_STATS["lookups"], LEMMA_STATS["lemmatizer_calls"]
+    return f"lemma lookups={lookups}, lemmatizer calls={calls}, avoided={lookups - calls}"
+
+
+# -------------------------------
+# Hook corpus (token x post matrix)
+# -------------------------------
+WORD_STATS_COLUMNS = ["word", "freq", "metric_avg"]
+
+
+class HookCorpus:
+    """
+    Sparse token x post count matrix for the hooks of one data load.
+
+    Stored as COO arrays (post row, term column, count); summing over posts is
+    a bincount, i.e. a sparse matrix-vector product. For every HOOK_METRICS
+    entry this gives, per word:
+
+    freq:
+      Token frequency across hooks (counts repeated occurrences within a hook).
+    metric_avg:
+      Average engagement metric across posts that contain the word
+      (counts a word at most once per post for the average).
+
+    Stats for all metrics are computed up front, so selector changes are a
+    column lookup.
+    """
+
+    def __init__(self, tokens_per_post: List[List[str]], metrics: Dict[str, np.ndarray]):
+        vocab: Dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        for row, tokens in enumerate(tokens_per_post):
+            per_post: Dict[int, int] = {}
+            for t in tokens:
+                col = vocab.setdefault(t, len(vocab))
+                per_post[col] = per_post.get(col, 0) + 1
+            rows.extend([row] * len(per_post))
+            cols.extend(per_post.keys())
+            counts.extend(per_post.values())
+
+        self.words = list(vocab)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.float64)
+        n_words = len(self.words)
+
+        self.freq = np.bincount(self.cols, weights=self.counts, minlength=n_words).astype(np.int64)
+        self.doc_count = np.bincount(self.cols, minlength=n_words)
+        denom = np.where(self.doc_count > 0, self.doc_count, 1)
+        self.metric_avg = {
+            name: np.bincount(self.cols, weights=values[self.rows], minlength=n_words) / denom
+            for name, values in metrics.items()
+        }
+        self._stats: Dict[str, pd.DataFrame] = {}
+
+        digest = hashlib.sha1("\0".join(self.words).encode("utf-8"))
+        for arr in (self.rows, self.cols, self.counts, *(metrics[k] for k in sorted(metrics))):
+            digest.update(np.ascontiguousarray(arr).tobytes())
+        # Content fingerprint: identical hooks and metrics give the same version
+        self.version = digest.hexdigest()[:16]
+
+    @property
+    def empty(self) -> bool:
+        return not self.words
+
+    def word_stats(self, metric_name: str) -> pd.DataFrame:
+        """Returns dataframe: word, freq, metric_avg (sorted by freq, then metric_avg)."""
+        if self.empty:
+            return pd.DataFrame(columns=WORD_STATS_COLUMNS)
+        if metric_name not in self.metric_avg:
+            metric_name = "Likes"
+        stats = self._stats.get(metric_name)
+        if stats is None:
+            stats = pd.DataFrame({
+                "word": self.words,
+                "freq": self.freq,
+                "metric_avg": self.metric_avg[metric_name],
+            })
+            stats = stats.sort_values(["freq", "metric_avg"], ascending=[False, False]).reset_index(drop=True)
+            self._stats[metric_name] = stats
+        return stats
+
+
+def build_hook_corpus(posts: pd.DataFrame) -> HookCorpus:
+    """Corpus of VIDEO posts with non-empty Hook Text, with every hook metric attached."""
+    df = posts
+    if df is None or df.empty or "Hook Text" not in df.columns:
+        return HookCorpus([], {})
+    if "Content Type" in df.columns:
+        df = df[df["Content Type"].astype(str).str.upper() == "VIDEO"]
+    df = df[df["Hook Text"].astype(str).str.strip().ne("")]
+
+    tokens = tokenize_hooks(df["Hook Text"].tolist())
+    TOKEN_CACHE.save()
+    print(f"Hook corpus: {len(tokens)} hooks ({TOKEN_CACHE.hits} cache hits, "
+          f"{TOKEN_CACHE.misses} misses so far); {lemma_memo_report()}")
+    metrics = {name: hook_metric_values(df, name) for name in HOOK_METRICS}
+    return HookCorpus(tokens, metrics)
@@ -0,0 +1,116 @@
+# data/leaderboard.py
+from __future__ import annotations
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Leaderboard metric (as shown in the selector) -> posts column ranked by it
+LEADERBOARD_METRICS = {
+    "Engagement Rate": "Engagement Rate",
+    "Likes": "Likes Count",
+    "Reach": "Reach",
+    "Saves": "Saves",
+}
+LEADERBOARD_COLUMNS = ["Display Label", "Likes Count", "Reach", "Saves", "Audience Comments Count", "Engagement Rate"]
+ALL_CONTENT_TYPES = "All"
+
+
+class Leaderboard:
+    """
+    Top posts per metric, ranked once per data load.
+
+    Each metric keeps the row positions of posts_data in descending order,
+    overall and per content type; ties keep posts_data order and missing
+    values are left out, as with nlargest(). A top-K is the first K
+    positions of a ranking. With a date window the ranking is scanned only
+    until K posts fall inside it, so no query sorts the frame again.
+    """
+
+    def __init__(self, posts: Optional[pd.DataFrame] = None, k: int = 5):
+        self.k = k
+        self.content_types: Tuple[str, ...] = ()
+        self._posts = posts if posts is not None else pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+        self._ranked: Dict[Tuple[str, str], np.ndarray] = {}
+        self._days = np.full(len(self._posts), np.datetime64("NaT"), dtype="datetime64[D]")
+        self._top: Dict[str, pd.DataFrame] = {}
+        self._first_day = self._last_day = None
+        if self._posts.empty:
+            return
+
+        if "Timestamp" in self._posts.columns:
+            ts = pd.to_datetime(self._posts["Timestamp"], errors="coerce")
+            if ts.dt.tz is not None:
+                ts = ts.dt.tz_localize(None)  # calendar day as stored (UTC), like the rollup
+            self._days = ts.to_numpy().astype("datetime64[D]")
+            dated = self._days[~np.isnat(self._days)]
+            if len(dated):
+                self._first_day, self._last_day = dated.min(), dated.max()
+
+        types = None
+        if "Content Type" in self._posts.columns:
+            types = self._posts["Content Type"].astype(object).to_numpy()
+            self.content_types = tuple(sorted({str(t) for t in types if pd.notna(t) and str(t)}))
+
+        for metric, column in LEADERBOARD_METRICS.items():
+            if column not in self._posts.columns:
+                continue
+            values = pd.to_numeric(self._posts[column], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            positions = np.flatnonzero(~np.isnan(values))
+            ranked = positions[np.argsort(-values[positions], kind="stable")]
+            self._ranked[(metric, ALL_CONTENT_TYPES)] = ranked
+            if types is not None:
+                ranked_types = types[ranked]
+                for content_type in self.content_types:
+                    self._ranked[(metric, content_type)] = ranked[ranked_types == content_type]
+            self._top[metric] = self._rows(ranked[:k])
+
+    @property
+    def empty(self) -> bool:
+        return not self._ranked
+
+    def _rows(self, positions: np.ndarray) -> pd.DataFrame:
+        columns = [c for c in LEADERBOARD_COLUMNS if c in self._posts.columns]
+        return self._posts.iloc[positions][columns]
+
+    def _in_window(self, ranked: np.ndarray, start: Optional[date], end: Optional[date], k: int) -> np.ndarray:
+        lo = None if start is None else np.datetime64(start, "D")
+        hi = None if end is None else np.datetime64(end, "D")
+        found = []
+        count, step, i = 0, max(64, 8 * k), 0
+        while i < len(ranked) and count < k:
+            chunk = ranked[i:i + step]
+            days = self._days[chunk]
+            keep = ~np.isnat(days)
+            if lo is not None:
+                keep &= days >= lo
+            if hi is not None:
+                keep &= days <= hi
+            hits = chunk[keep][:k - count]
+            found.append(hits)
+            count += len(hits)
+            i += step
+            step *= 2  # sparse windows: widen the scan instead of stepping in small chunks
+        return np.concatenate(found) if found else ranked[:0]
+
+    def top(self, metric: str, k: Optional[int] = None, content_type: Optional[str] = None,
+            start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+        """Top `k` posts by `metric`, optionally of one content type and within [start, end] (inclusive)."""
+        k = self.k if k is None else k
+        content_type = content_type or ALL_CONTENT_TYPES
+        ranked = self._ranked.get((metric, content_type))
+        if ranked is None:
+            return self._rows(np.array([], dtype=np.int64))
+
+        # A window covering every post is no window at all
+        if start is not None and self._first_day is not None and np.datetime64(start, "D") <= self._first_day:
+            start = None
+        if end is not None and self._last_day is not None and np.datetime64(end, "D") >= self._last_day:
+            end = None
+
+        if start is None and end is None:
+            if content_type == ALL_CONTENT_TYPES and k == self.k:
+                return self._top[metric]
+            return self._rows(ranked[:k])
+        return self._rows(self._in_window(ranked, start, end, k))
@@ -0,0 +1,93 @@
+# data/metrics.py
+from __future__ import annotations
+import math
+
+import numpy as np
+import pandas as pd
+
+# Columns added to posts_data by add_post_kpis
+POST_KPIS = ("Interactions", "Engagement Rate")
+
+
+def nz(x, default=0):
+    """Return default for None/NaN/NA; otherwise x."""
+    try:
+        if x is None or x is pd.NA or x is pd.NaT:
+            return default
+        if isinstance(x, float) and math.isnan(x):
+            return default
+        return x
+    except Exception:
+        return default
+
+
+def calculate_engagement_rate(row):
+    """Per-row engagement rate; kept as the reference for add_post_kpis (see benchmarks/)."""
+    try:
+        audience_comments = float(nz(row.get("Audience Comments Count", 0)))
+        likes = float(nz(row.get("Likes Count", 0)))
+        saves = float(nz(row.get("Saves", 0)))
+        reach = float(nz(row.get("Reach", 0)))
+        if reach > 0:
+            return round(((audience_comments + likes + saves) / reach) * 100, 2)
+        return 0.0
+    except Exception:
+        return 0.0
+
+
+def count_column(df: pd.DataFrame, name: str) -> np.ndarray:
+    """A count/metric column as float64 with missing or non-numeric values as 0."""
+    if name not in df.columns:
+        return np.zeros(len(df), dtype=np.float64)
+    col = df[name]
+    if col.dtype == object:
+        col = pd.to_numeric(col, errors="coerce")
+    values = col.to_numpy(dtype=np.float64, copy=True, na_value=np.nan)
+    values[np.isnan(values)] = 0.0
+    return values
+
+
+def add_post_kpis(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add POST_KPIS to a posts frame in one vectorized pass (in place).
+
+    Interactions = Audience Comments + Likes + Saves
+    Engagement Rate = Interactions / Reach × 100, rounded to 2 dp like
+    round() in calculate_engagement_rate; 0 when Reach is missing, zero or
+    negative.
+    """
+    likes = count_column(df, "Likes Count")
+    comments = count_column(df, "Audience Comments Count")
+    saves = count_column(df, "Saves")
+    reach = count_column(df, "Reach")
+
+    interactions = comments + likes + saves
+    rate = np.zeros(len(df), dtype=np.float64)
+    has_reach = reach > 0
+    percent = interactions[has_reach] / reach[has_reach] * 100
+    rounded = np.round(percent, 2)
+    # np.round rounds percent * 100 (inexact) half to even, while round()
+    # rounds the exact value; they can only disagree next to a tie
+    scaled = percent * 100
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_tie] = [round(v, 2) for v in percent[near_tie].tolist()]
+    rate[has_reach] = rounded
+
+    df["Interactions"] = interactions
+    df["Engagement Rate"] = rate
+    return df
+
+
+# Engagement metrics selectable on the Semantics page (besides "Frequency")
+HOOK_METRICS = ("Likes", "Audience Comments", "Likes + Audience Comments", "Average Watch Time")
+
+
+def hook_metric_values(df: pd.DataFrame, metric_name: str) -> np.ndarray:
+    """Per-post value of a HOOK_METRICS entry as float64 (unknown names fall back to Likes)."""
+    if metric_name == "Audience Comments":
+        return count_column(df, "Audience Comments Count")
+    if metric_name == "Likes + Audience Comments":
+        return count_column(df, "Likes Count") + count_column(df, "Audience Comments Count")
+    if metric_name == "Average Watch Time":
+        return count_column(df, "Average Watch Time")
+    return count_column(df, "Likes Count")
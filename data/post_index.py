@@ -0,0 +1,101 @@
+# data/post_index.py
+from __future__ import annotations
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.metrics import count_column
+
+
+class PostMetrics(NamedTuple):
+    likes: int
+    reach: int
+    saves: int
+    comments: int
+    engagement: float
+
+
+EMPTY_POST_METRICS = PostMetrics(0, 0, 0, 0, 0.0)
+
+
+class PostIndex:
+    """
+    Post ID -> precomputed metrics and row position, built once per data load.
+
+    When a Post ID repeats, the first row (in posts_data order) wins, matching
+    the old boolean-mask lookup.
+    """
+
+    def __init__(self, df: Optional[pd.DataFrame] = None):
+        self._positions: Dict[str, int] = {}
+        self._metrics: Dict[str, PostMetrics] = {}
+        if df is None or df.empty or "Post ID" not in df.columns:
+            return
+
+        ids = df["Post ID"].astype(str).tolist()
+        likes = count_column(df, "Likes Count").astype(np.int64).tolist()
+        reach = count_column(df, "Reach").astype(np.int64).tolist()
+        saves = count_column(df, "Saves").astype(np.int64).tolist()
+        comments = count_column(df, "Audience Comments Count").astype(np.int64).tolist()
+        engagement = count_column(df, "Engagement Rate").tolist()
+
+        for pos, pid in enumerate(ids):
+            if pid in self._positions:
+                continue
+            self._positions[pid] = pos
+            self._metrics[pid] = PostMetrics(likes[pos], reach[pos], saves[pos], comments[pos], engagement[pos])
+
+    def __contains__(self, post_id) -> bool:
+        return str(post_id) in self._metrics
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def metrics(self, post_id) -> PostMetrics:
+        return self._metrics.get(str(post_id), EMPTY_POST_METRICS)
+
+    def position(self, post_id) -> Optional[int]:
+        """Row position of the post in the frame the index was built from."""
+        return self._positions.get(str(post_id))
+
+
+class PostOptions:
+    """
+    Post selector options, (Post ID, Display Label) in posts_data order,
+    carried over from one data load to the next.
+
+    Records are matched to the previous load by record id and their two
+    fields compared in one vectorized pass; only new or changed records get
+    a fresh option tuple, the others reuse the tuple of the previous load.
+    """
+
+    def __init__(self):
+        self._records: Optional[pd.Index] = None
+        self._ids = self._labels = self._options = np.array([], dtype=object)
+        self.built = 0
+        self.reused = 0
+
+    def update(self, df: Optional[pd.DataFrame]) -> Tuple[Tuple[str, str], ...]:
+        if df is None or df.empty or "Post ID" not in df.columns:
+            self.__init__()
+            return ()
+        ids = df["Post ID"].astype(str).to_numpy(dtype=object)
+        labels = df["Display Label"].to_numpy(dtype=object)
+        records = df.index if df.index.is_unique else pd.RangeIndex(len(df))
+
+        options = np.empty(len(df), dtype=object)
+        same = np.zeros(len(df), dtype=bool)
+        if self._records is not None and len(self._records):
+            prev = self._records.get_indexer(records)
+            known = np.flatnonzero(prev >= 0)
+            matched = (self._ids[prev[known]] == ids[known]) & (self._labels[prev[known]] == labels[known])
+            same[known[matched]] = True
+            options[same] = self._options[prev[same]]
+
+        changed = np.flatnonzero(~same)
+        for pos, option in zip(changed.tolist(), zip(ids[changed].tolist(), labels[changed].tolist())):
+            options[pos] = option  # one by one: numpy would unpack a list of tuples into a 2-D array
+        self.built, self.reused = len(changed), len(df) - len(changed)
+        self._records, self._ids, self._labels, self._options = records, ids, labels, options
+        return tuple(options)
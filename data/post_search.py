@@ -0,0 +1,100 @@
+# data/post_search.py
+from __future__ import annotations
+import os
+import re
+import unicodedata
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.schema import TextStore
+
+# Options per page of the post selector
+POST_PAGE_SIZE = int(os.getenv("POST_PAGE_SIZE", 20))
+
+_WORD = re.compile(r"\w+")
+
+
+def fold(text) -> str:
+    """Lowercase without accents ("Você" -> "voce"), so a query matches either spelling."""
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+class SearchPage(NamedTuple):
+    options: Tuple[Tuple[str, str], ...]  # (Post ID, Display Label) of this page
+    page: int  # zero-based, clamped to the pages there are
+    pages: int
+    total: int  # matching posts across all pages
+    first: int  # 1-based rank of the first option shown (0 when nothing matched)
+
+
+class PostSearch:
+    """
+    Type-ahead search over post labels and hook texts, built once per data load.
+
+    Every word of Display Label and Hook Text (lowercased, accents folded) is
+    a term. Terms are sorted and the posts of each one are stored as a run
+    of row positions, in term order, so all terms starting with a prefix
+    form one contiguous slice, found by two binary searches. A post matches
+    when each query word prefixes one of its terms. Matches keep posts_data
+    order (newest first) and are handed out a page at a time.
+    """
+
+    def __init__(self, posts: Optional[pd.DataFrame] = None,
+                 options: Sequence[Tuple[str, str]] = (), texts: Optional[TextStore] = None):
+        self._options = tuple(options)
+        self._terms = np.array([], dtype=object)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._rows = np.array([], dtype=np.int64)
+        if posts is None or posts.empty:
+            return
+
+        text = pd.Series("", index=pd.RangeIndex(len(posts)), dtype=object)
+        if "Display Label" in posts.columns:
+            text += posts["Display Label"].astype(str).to_numpy(dtype=object)
+        hooks = texts.frame(["Hook Text"]) if texts is not None and "Hook Text" in texts.columns else posts
+        if "Hook Text" in hooks.columns:
+            text += " " + hooks["Hook Text"].fillna("").astype(str).to_numpy(dtype=object)
+
+        # Words are split before folding, so accents are stripped once per distinct word
+        words = text.str.lower().str.findall(_WORD.pattern).explode().dropna()
+        if words.empty:
+            return
+        word_codes, distinct = pd.factorize(words.to_numpy())
+        term_codes, terms = pd.factorize(pd.Index([fold(w) for w in distinct]), sort=True)
+        # (term, row) pairs, deduplicated and sorted by term then row, as one int64 key
+        n = len(posts)
+        keys = np.unique(term_codes[word_codes].astype(np.int64) * n + words.index.to_numpy(dtype=np.int64))
+        codes = keys // n
+        self._terms = np.asarray(terms, dtype=object)
+        self._rows = keys % n
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(terms)))])
+
+    def __len__(self) -> int:
+        return len(self._options)
+
+    def match(self, query: str) -> np.ndarray:
+        """Row positions (ascending) of the posts matching every word of `query`."""
+        words = _WORD.findall(fold(query or ""))
+        if not words:
+            return np.arange(len(self._options))
+        found = None
+        for word in words:
+            lo = int(np.searchsorted(self._terms, word, "left"))
+            hi = int(np.searchsorted(self._terms, word + "\U0010ffff", "left"))
+            rows = self._rows[self._offsets[lo]:self._offsets[hi]]
+            rows = rows if hi - lo <= 1 else np.unique(rows)
+            found = rows if found is None else np.intersect1d(found, rows, assume_unique=True)
+            if not len(found):
+                break
+        return found
+
+    def page(self, query: str, page: int = 0, page_size: int = POST_PAGE_SIZE) -> SearchPage:
+        rows = self.match(query)
+        pages = max(1, -(-len(rows) // page_size))
+        page = min(max(int(page), 0), pages - 1)
+        chunk = rows[page * page_size:(page + 1) * page_size]
+        first = page * page_size + 1 if len(chunk) else 0
+        return SearchPage(tuple(self._options[i] for i in chunk), page, pages, len(rows), first)
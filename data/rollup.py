@@ -0,0 +1,84 @@
+# data/rollup.py
+from __future__ import annotations
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from data.metrics import count_column
+
+# Selectable groupings for the engagement-over-time chart
+GRANULARITIES = ("Day", "Week", "Month")
+
+_SUMMED = ("Likes Count", "Audience Comments Count", "Saves", "Reach")
+
+
+class DailyRollup:
+    """
+    Per-day sums of likes, comments, saves and reach, built once per data load.
+
+    Days are sorted and each metric is kept as a prefix sum, so the totals of
+    any run of days are one subtraction. A date window is located by binary
+    search; Week and Month buckets are runs of consecutive days, so grouping
+    never touches the posts frame again.
+    """
+
+    def __init__(self, posts: Optional[pd.DataFrame] = None):
+        self.days = np.array([], dtype="datetime64[D]")
+        self._prefix = np.zeros((1, len(_SUMMED)), dtype=np.float64)
+        if posts is None or posts.empty or "Timestamp" not in posts.columns:
+            return
+
+        ts = pd.to_datetime(posts["Timestamp"], errors="coerce")
+        valid = ts.notna().to_numpy()
+        if not valid.any():
+            return
+        if ts.dt.tz is not None:
+            ts = ts.dt.tz_localize(None)  # calendar day as stored (UTC), like Timestamp.date()
+        day = ts.to_numpy()[valid].astype("datetime64[D]")
+        values = np.column_stack([count_column(posts, name)[valid] for name in _SUMMED])
+
+        self.days, inverse = np.unique(day, return_inverse=True)
+        daily = np.zeros((len(self.days), len(_SUMMED)), dtype=np.float64)
+        np.add.at(daily, inverse, values)
+        self._prefix = np.vstack([np.zeros((1, len(_SUMMED))), np.cumsum(daily, axis=0)])
+
+    @property
+    def empty(self) -> bool:
+        return len(self.days) == 0
+
+    def _window(self, start: Optional[date], end: Optional[date]):
+        lo = 0 if start is None else int(np.searchsorted(self.days, np.datetime64(start, "D"), "left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, np.datetime64(end, "D"), "right"))
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def _bucket_starts(days: np.ndarray, granularity: str) -> np.ndarray:
+        if granularity == "Week":
+            # 1970-01-01 was a Thursday: shift by 3 so buckets start on Monday
+            return days - (days.astype(np.int64) + 3) % 7
+        if granularity == "Month":
+            return days.astype("datetime64[M]").astype("datetime64[D]")
+        return days
+
+    def engagement_over_time(self, start: Optional[date] = None, end: Optional[date] = None,
+                             granularity: str = "Day") -> pd.DataFrame:
+        """Engagement Rate per Day/Week/Month bucket within [start, end] (inclusive)."""
+        lo, hi = self._window(start, end)
+        if lo == hi:
+            return pd.DataFrame(columns=["Date", "Engagement Rate"])
+
+        keys = self._bucket_starts(self.days[lo:hi], granularity)
+        # Bucket i covers days [bounds[i], bounds[i + 1]) of the window
+        bounds = np.concatenate([[0], np.flatnonzero(keys[1:] != keys[:-1]) + 1, [hi - lo]]) + lo
+        sums = self._prefix[bounds[1:]] - self._prefix[bounds[:-1]]
+
+        likes, comments, saves, reach = sums.T
+        rate = np.zeros(len(sums))
+        has_reach = reach != 0
+        rate[has_reach] = (likes + comments + saves)[has_reach] / reach[has_reach] * 100
+        return pd.DataFrame({
+            "Date": keys[bounds[:-1] - lo].astype(object),  # datetime.date, as before
+            "Engagement Rate": np.round(rate, 2),
+        })
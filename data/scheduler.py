@@ -0,0 +1,112 @@
+# data/scheduler.py
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Cap on how far an idle table's interval stretches (multiple of the configured one)
+DEFAULT_MAX_BACKOFF = 8
+
+
+class RefreshScheduler:
+    """
+    Refreshes each table on its own interval from a daemon thread.
+
+    `refresh(keys)` is called with the tables that are due and is expected
+    to report every table it synced through `record()`, as manual refreshes
+    do too. When a table's watermark and row count did not move, its next
+    interval doubles (up to `max_backoff` times the configured one); any
+    change resets it. Tables with no interval are only refreshed manually.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[Tuple[str, ...]], None],
+        max_backoff: int = DEFAULT_MAX_BACKOFF,
+        tick: float = 5.0,
+    ):
+        self.refresh = refresh
+        self.max_backoff = max(1, max_backoff)
+        self.tick = tick
+        self._intervals: Dict[str, float] = {}
+        self._backoff: Dict[str, int] = {}
+        self._next_due: Dict[str, float] = {}
+        self._seen: Dict[str, tuple] = {}  # key -> (watermark, rows) at the last sync
+        self._synced_at: Dict[str, float] = {}  # key -> wall-clock time of the last sync
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_intervals(self, intervals: Dict[str, float], max_backoff: Optional[int] = None):
+        """Seconds between refreshes per table key; 0 or missing disables it."""
+        now = time.monotonic()
+        with self._lock:
+            if max_backoff is not None:
+                self.max_backoff = max(1, max_backoff)
+            self._intervals = {k: float(v) for k, v in intervals.items() if v and v > 0}
+            for key, interval in self._intervals.items():
+                self._next_due[key] = now + interval * self._backoff.setdefault(key, 1)
+
+    def record(self, key: str, watermark: Optional[str], rows: int) -> bool:
+        """Note a completed sync of `key`; returns True if the table changed since the last one."""
+        now = time.monotonic()
+        with self._lock:
+            changed = self._seen.get(key) != (watermark, rows)
+            self._seen[key] = (watermark, rows)
+            self._synced_at[key] = time.time()
+            if key in self._intervals:
+                backoff = 1 if changed else min(self._backoff.get(key, 1) * 2, self.max_backoff)
+                self._backoff[key] = backoff
+                self._next_due[key] = now + self._intervals[key] * backoff
+        return changed
+
+    def synced_at(self) -> Dict[str, float]:
+        """Epoch seconds of each table's last successful sync."""
+        with self._lock:
+            return dict(self._synced_at)
+
+    def ages(self) -> Dict[str, float]:
+        """Seconds since each table was last synced."""
+        now = time.time()
+        return {key: now - at for key, at in self.synced_at().items()}
+
+    def stale(self) -> Tuple[str, ...]:
+        """Scheduled tables older than their SLA (configured interval x max_backoff)."""
+        ages = self.ages()
+        with self._lock:
+            return tuple(
+                k for k, interval in self._intervals.items()
+                if ages.get(k, 0) > interval * self.max_backoff
+            )
+
+    def due(self) -> Tuple[str, ...]:
+        now = time.monotonic()
+        with self._lock:
+            return tuple(k for k, at in self._next_due.items() if k in self._intervals and at <= now)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.tick):
+            keys = self.due()
+            if not keys:
+                continue
+            try:
+                self.refresh(keys)
+            except Exception as e:
+                print(f"Scheduled refresh failed for {', '.join(keys)}: {e}")
+            self._postpone(keys)
+
+    def _postpone(self, keys: Iterable[str]):
+        # A table the refresh didn't record (failed fetch) retries after its base interval
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                if key in self._intervals and self._next_due.get(key, 0) <= now:
+                    self._next_due[key] = now + self._intervals[key]
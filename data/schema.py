@@ -0,0 +1,292 @@
+# data/schema.py
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Declared column types per table key (see get_airtable_config()["tables"]).
+# Fields not listed here are still ingested, as object columns. These are the
+# fields the pages read, so a field projection must include all of them.
+TABLE_SCHEMAS: Dict[str, Dict[str, str]] = {
+    "ig_posts": {
+        "Post ID": "string",
+        "Timestamp": "datetime64[ns, UTC]",
+        "Content Type": "string",
+        "Hook Text": "string",
+        "Likes Count": "Int32",
+        "Reach": "Int32",
+        "Saves": "Int32",
+        "Audience Comments Count": "Int32",
+        "Average Watch Time": "float64",
+        "Updated At": "datetime64[ns, UTC]",
+    },
+    "ig_accounts": {
+        "Date": "datetime64[ns]",
+        "Reach": "Int32",
+        "Lifetime Follower Count": "Int32",
+        "Lifetime Profile Views": "Int32",
+        "Updated At": "datetime64[ns, UTC]",
+    },
+}
+
+# How each table is held once normalized (see compact_frame): counts in the
+# smallest integer type their values fit, repeated labels as categoricals and
+# long free text in a TextStore outside the frame.
+COMPACT_SCHEMAS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "ig_posts": {
+        "counts": ("Likes Count", "Reach", "Saves", "Audience Comments Count", "Interactions"),
+        "categories": ("Content Type", "Display Label"),
+        "text": ("Hook Text",),
+    },
+    "ig_accounts": {
+        "counts": ("Reach", "Lifetime Follower Count", "Lifetime Profile Views"),
+        "categories": ("Day",),
+    },
+}
+# Undeclared string fields averaging more characters than this go to the TextStore too
+HEAVY_TEXT_CHARS = 80
+
+_INITIAL_CAPACITY = 256
+_INT32_MIN, _INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+class _Column:
+    """Growable typed buffer for one column; grows geometrically, trimmed on finish."""
+
+    def __init__(self, dtype: str, capacity: int, filled: int = 0):
+        self.dtype = dtype
+        if dtype.startswith("datetime64"):
+            self.kind = "datetime"
+            self.values = np.full(capacity, np.iinfo(np.int64).min, dtype=np.int64)
+        elif dtype == "Int32":
+            self.kind = "int"
+            self.values = np.zeros(capacity, dtype=np.int32)
+            self.mask = np.ones(capacity, dtype=bool)
+        elif dtype == "float64":
+            self.kind = "float"
+            self.values = np.full(capacity, np.nan, dtype=np.float64)
+        else:
+            self.kind = "object"
+            self.values = [None] * filled
+
+    def _reserve(self, size: int):
+        if self.kind == "object" or size <= len(self.values):
+            return
+        cap = max(size, 2 * len(self.values))
+        grown = np.empty(cap, dtype=self.values.dtype)
+        grown[: len(self.values)] = self.values
+        if self.kind == "datetime":
+            grown[len(self.values):] = np.iinfo(np.int64).min
+        elif self.kind == "float":
+            grown[len(self.values):] = np.nan
+        elif self.kind == "int":
+            mask = np.ones(cap, dtype=bool)
+            mask[: len(self.mask)] = self.mask
+            self.mask = mask
+        self.values = grown
+
+    def put(self, start: int, page_values: List):
+        end = start + len(page_values)
+        if self.kind == "object":
+            self.values.extend(page_values)
+            return
+        self._reserve(end)
+        if self.kind == "datetime":
+            utc = self.dtype != "datetime64[ns]"
+            parsed = pd.to_datetime(pd.Series(page_values, dtype=object), errors="coerce", utc=True)
+            if not utc:
+                parsed = parsed.dt.tz_localize(None)
+            self.values[start:end] = parsed.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            return
+        nums = pd.to_numeric(pd.Series(page_values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+        if self.kind == "float":
+            self.values[start:end] = nums
+            return
+        missing = np.isnan(nums)
+        self.values[start:end] = np.where(missing, 0, np.clip(np.rint(nums), _INT32_MIN, _INT32_MAX))
+        self.mask[start:end] = missing
+
+    def finish(self, n: int):
+        if self.kind == "datetime":
+            out = pd.DatetimeIndex(self.values[:n].view("datetime64[ns]"))
+            return (out.tz_localize("UTC") if self.dtype != "datetime64[ns]" else out).array
+        if self.kind == "int":
+            return pd.arrays.IntegerArray(self.values[:n].copy(), self.mask[:n].copy())
+        if self.kind == "float":
+            return self.values[:n].copy()
+        if self.dtype == "string":
+            return pd.array([v if v is None or isinstance(v, str) else str(v) for v in self.values],
+                            dtype="string")
+        return self.values
+
+
+class FrameBuilder:
+    """
+    Build a typed DataFrame from Airtable record pages without keeping the pages.
+
+    Declared columns go into typed buffers (datetime64, nullable Int32, float64,
+    string); any other field becomes an object column, back-filled with None
+    for rows read before it first appeared.
+    """
+
+    def __init__(self, schema: Optional[Dict[str, str]] = None, index_name: Optional[str] = None):
+        self.schema = dict(schema or {})
+        self.index_name = index_name
+        self.ids: List[str] = []
+        self.columns: Dict[str, _Column] = {
+            name: _Column(dtype, _INITIAL_CAPACITY) for name, dtype in self.schema.items()
+        }
+
+    def add_page(self, records: Iterable[dict]):
+        records = list(records)
+        if not records:
+            return
+        start = len(self.ids)
+        self.ids.extend(r["id"] for r in records)
+        names = set()
+        for r in records:
+            names.update(r["fields"])
+        for name in names:
+            if name not in self.columns:
+                self.columns[name] = _Column("object", 0, filled=start)
+        for name, col in self.columns.items():
+            col.put(start, [r["fields"].get(name) for r in records])
+
+    def to_frame(self) -> pd.DataFrame:
+        n = len(self.ids)
+        data = {}
+        for name, col in self.columns.items():
+            data[name] = col.finish(n)
+        index = pd.Index(self.ids, name=self.index_name, dtype=object)
+        df = pd.DataFrame(data, index=index)
+        for name, dtype in self.schema.items():
+            # e.g. an all-missing string column from an empty build
+            if str(df[name].dtype) != dtype:
+                df[name] = df[name].astype(dtype)
+        return df
+
+
+def coerce_to_schema(df: pd.DataFrame, schema: Optional[Dict[str, str]]) -> pd.DataFrame:
+    """Cast declared columns of a frame built elsewhere (e.g. an old snapshot) in place."""
+    for name, dtype in (schema or {}).items():
+        if name not in df.columns or str(df[name].dtype) == dtype:
+            continue
+        if dtype.startswith("datetime64"):
+            parsed = pd.to_datetime(df[name], errors="coerce", utc=True)
+            df[name] = parsed.dt.tz_localize(None) if dtype == "datetime64[ns]" else parsed
+        elif dtype in ("Int32", "float64"):
+            nums = pd.to_numeric(df[name], errors="coerce")
+            df[name] = nums.round().astype(dtype) if dtype == "Int32" else nums.astype(dtype)
+        else:
+            df[name] = df[name].astype(dtype)
+    return df
+
+
+# -------------------------------
+# Compact storage
+# -------------------------------
+_UNSIGNED = ("UInt8", "UInt16", "UInt32", "UInt64")
+_SIGNED = ("Int8", "Int16", "Int32", "Int64")
+_TEXT_CODEC = next((c for c in ("zstd", "lz4") if pa.Codec.is_available(c)), None)
+
+
+def frame_bytes(df: Optional[pd.DataFrame]) -> int:
+    """Memory held by a frame, index and Python string objects included."""
+    return 0 if df is None else int(df.memory_usage(index=True, deep=True).sum())
+
+
+class TextStore:
+    """
+    Long free-text columns of one table, kept out of the frame sessions bind.
+
+    The columns are held as one compressed Arrow IPC buffer instead of a
+    Python string per cell, and decoded only when asked for (the hook corpus
+    build, for one). Rows line up with the frame they were split from.
+    """
+
+    def __init__(self, df: Optional[pd.DataFrame] = None):
+        self.columns: Tuple[str, ...] = () if df is None else tuple(df.columns)
+        self._index = None if df is None else df.index
+        self._buffer: Optional[pa.Buffer] = None
+        if not self.columns:
+            return
+        table = pa.Table.from_pandas(df.astype("string"), preserve_index=False)
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=_TEXT_CODEC)
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+        self._buffer = sink.getvalue()
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if self._buffer is None else self._buffer.size
+
+    def frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Decode the stored columns (all of them by default) as string columns."""
+        names = [c for c in (self.columns if columns is None else columns) if c in self.columns]
+        if self._buffer is None or not names:
+            return pd.DataFrame(index=self._index)
+        table = pa.ipc.open_stream(self._buffer).read_all().select(names)
+        out = table.to_pandas(types_mapper={pa.string(): pd.StringDtype(), pa.large_string(): pd.StringDtype()}.get)
+        out.index = self._index
+        return out
+
+    def attach(self, df: pd.DataFrame) -> pd.DataFrame:
+        """A copy of `df`, the frame the columns were split from, with them put back."""
+        texts = self.frame()
+        return df.assign(**{name: texts[name].array for name in texts.columns})
+
+
+def _compact_count(col: pd.Series) -> pd.Series:
+    nums = pd.to_numeric(col, errors="coerce")
+    values = nums.to_numpy(dtype=np.float64, na_value=np.nan)
+    present = values[~np.isnan(values)]
+    if len(present) and not np.array_equal(present, np.round(present)):
+        return col  # not whole numbers
+    lo, hi = (present.min(), present.max()) if len(present) else (0, 0)
+    for dtype in (_UNSIGNED if lo >= 0 else _SIGNED):
+        info = np.iinfo(dtype.lower())
+        if info.min <= lo and hi <= info.max:
+            return nums.astype(dtype)
+    return col
+
+
+def _compact_category(col: pd.Series) -> pd.Series:
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col
+    try:
+        repeated = col.nunique(dropna=True) <= len(col) // 2
+    except TypeError:  # list fields
+        return col
+    return col.astype("category") if repeated else col
+
+
+def _is_heavy_text(col: pd.Series) -> bool:
+    if col.dtype != object and not isinstance(col.dtype, pd.StringDtype):
+        return False
+    values = col.dropna()
+    if values.empty or not values.map(lambda v: isinstance(v, str)).all():
+        return False
+    return values.str.len().mean() > HEAVY_TEXT_CHARS
+
+
+def compact_frame(df: pd.DataFrame, key: str) -> Tuple[pd.DataFrame, TextStore]:
+    """
+    A compact copy of table `key` following its COMPACT_SCHEMAS entry, and
+    the TextStore holding its declared (and detected) long text columns.
+    """
+    spec = COMPACT_SCHEMAS.get(key, {})
+    declared = set(TABLE_SCHEMAS.get(key, {})) | {name for names in spec.values() for name in names}
+    text = [c for c in spec.get("text", ()) if c in df.columns]
+    text += [c for c in df.columns if c not in declared and c not in text and _is_heavy_text(df[c])]
+
+    out = df.drop(columns=text)
+    for name in spec.get("counts", ()):
+        if name in out.columns:
+            out[name] = _compact_count(out[name])
+    for name in spec.get("categories", ()):
+        if name in out.columns:
+            out[name] = _compact_category(out[name])
+    return out, TextStore(df[text] if text else None)
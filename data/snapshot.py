@@ -0,0 +1,117 @@
+# data/snapshot.py
+from __future__ import annotations
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from data.airtable_fetch import fields_cover, latest_watermark
+from data.schema import TABLE_SCHEMAS, coerce_to_schema
+
+# Local on-disk copies of the fetched tables, one Arrow IPC file per table.
+# Files are uncompressed and read through a memory map, so reading one
+# costs no decompression; the frame built from it is still a private copy.
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR") or Path(__file__).resolve().parent / "snapshots")
+
+_META_WATERMARK = b"watermark"
+_META_SAVED_AT = b"saved_at"
+_META_TABLE = b"table"  # Airtable table name the snapshot was fetched from
+_META_FIELDS = b"fields"  # JSON field projection it was fetched with (null = every field)
+
+
+def snapshot_path(base_id: str, key: str) -> Path:
+    return SNAPSHOT_DIR / f"{base_id}__{key}.arrow"
+
+
+def save_snapshot(base_id: str, key: str, df: pd.DataFrame, watermark: Optional[str] = None,
+                  table_name: str = "", fields: Optional[List[str]] = None) -> bool:
+    """Write a table snapshot atomically; returns False if the frame can't be stored as Arrow."""
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=True)
+    except (pa.ArrowException, TypeError, ValueError) as e:
+        print(f"Snapshot skipped for {key}: {e}")
+        return False
+
+    meta = dict(table.schema.metadata or {})
+    meta[_META_WATERMARK] = (watermark or "").encode()
+    meta[_META_SAVED_AT] = str(time.time()).encode()
+    meta[_META_TABLE] = table_name.encode()
+    meta[_META_FIELDS] = json.dumps(fields).encode()
+    table = table.replace_schema_metadata(meta)
+
+    path = snapshot_path(base_id, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    # Readers holding a map of the old file keep a valid view after the swap.
+    os.replace(tmp, path)
+    return True
+
+
+def load_snapshot_table(base_id: str, key: str) -> Optional[pa.Table]:
+    """Memory-map a snapshot and return it as an Arrow table whose buffers point into the file."""
+    path = snapshot_path(base_id, key)
+    if not path.is_file():
+        return None
+    source = pa.memory_map(str(path), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_snapshot(base_id: str, key: str, table_name: Optional[str] = None,
+                  fields: Optional[List[str]] = None) -> Optional[Tuple[pd.DataFrame, Optional[str]]]:
+    """
+    Return (frame, watermark) for a stored table, or None if there is no usable snapshot.
+
+    With `table_name`, a snapshot fetched from another table, or with a
+    field projection that lacks some of `fields`, is not usable: merging
+    incremental syncs into it would never backfill the missing data.
+    """
+    try:
+        table = load_snapshot_table(base_id, key)
+    except (OSError, pa.ArrowException) as e:
+        print(f"Snapshot unreadable for {key}: {e}")
+        return None
+    if table is None:
+        return None
+    meta = table.schema.metadata or {}
+    if table_name is not None:
+        try:
+            stored_fields = json.loads(meta.get(_META_FIELDS, b"[]"))
+        except ValueError:
+            stored_fields = []
+        if meta.get(_META_TABLE, b"").decode() != table_name or not fields_cover(stored_fields, fields):
+            print(f"Snapshot for {key} was taken with another table or fields; doing a full fetch")
+            return None
+    watermark = meta.get(_META_WATERMARK, b"").decode() or None
+    df = table.to_pandas(split_blocks=True)  # copies off the map (object columns for text, NumPy blocks)
+    return df, watermark
+
+
+def load_snapshots(base_id: str, tables: dict,
+                   fields: Optional[Dict[str, Optional[List[str]]]] = None) -> Optional[Dict[str, Tuple[pd.DataFrame, Optional[str]]]]:
+    """Load every configured table, or None unless all of them have a usable snapshot."""
+    fields = fields or {}
+    result = {}
+    for key, table_name in tables.items():
+        snap = load_snapshot(base_id, key, table_name, fields.get(key))
+        if snap is None:
+            return None
+        df, watermark = snap
+        result[key] = (coerce_to_schema(df, TABLE_SCHEMAS.get(key)), watermark)
+    return result
+
+
+def save_snapshots(base_id: str, frames: Dict[str, pd.DataFrame], tables: Optional[dict] = None,
+                   fields: Optional[Dict[str, Optional[List[str]]]] = None):
+    """Persist freshly fetched raw frames; empty frames (failed fetches) are not stored."""
+    tables, fields = tables or {}, fields or {}
+    for key, df in frames.items():
+        if df is None or df.empty:
+            continue
+        save_snapshot(base_id, key, df, latest_watermark(df), tables.get(key, ""), fields.get(key))
@@ -0,0 +1,63 @@
+# data/view_cache.py
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, FrozenSet, Hashable, Iterable, Optional, Tuple
+
+
+class ViewCache:
+    """
+    Results of per-session callbacks, shared by every session.
+
+    Entries are keyed by (source, view name, arguments), where the source is
+    the fingerprint of the table the view reads, so sessions asking for the
+    same date window or metric pair on the same data get one computation
+    between them, and a publish that leaves that table unchanged keeps them.
+    Values are shared and must not be mutated. Least recently used entries
+    are evicted past `max_entries`; publishing a new dataset drops entries
+    of sources it no longer has (see `invalidate`).
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, object]" = OrderedDict()
+        self._sources: Optional[FrozenSet[str]] = None  # current sources, once a dataset is published
+        self._lock = threading.Lock()
+
+    def get(self, source: str, name: str, args: Tuple[Hashable, ...], compute: Callable[[], object]):
+        key = (source, name, args)
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+        # Computed outside the lock; two sessions racing on a cold key both compute it once
+        value = compute()
+        with self._lock:
+            if self._sources is not None and source not in self._sources:
+                return value  # invalidated while computing: don't store a stale entry
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, current_sources: Iterable[str]):
+        """Drop entries computed against any source not in `current_sources`."""
+        with self._lock:
+            self._sources = frozenset(current_sources)
+            for key in [k for k in self._entries if k[0] not in self._sources]:
+                del self._entries[key]
+
+    def report(self) -> str:
+        with self._lock:
+            total = self.hits + self.misses
+            rate = (self.hits / total * 100) if total else 0.0
+            return f"{len(self._entries)} entries, {self.hits} hits / {self.misses} misses ({rate:.0f}% hit rate)"
+
+
+VIEW_CACHE = ViewCache(max_entries=int(os.getenv("VIEW_CACHE_SIZE", 256)))
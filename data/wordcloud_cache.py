@@ -0,0 +1,322 @@
+# data/wordcloud_cache.py
+# Hook word-cloud rendering and a render cache serving PNGs from memory.
+from __future__ import annotations
+import colorsys
+import hashlib
+import io
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from flask import Blueprint, Response, abort, send_file
+
+from data.snapshot import SNAPSHOT_DIR
+from data.worker_pool import worker_context
+
+# URL prefix the Flask blueprint serves cached PNGs under
+WORDCLOUD_URL = "/wordcloud"
+
+
+# -------------------------------
+# Rendering
+# SIZE BY engagement metric, COLOR BY frequency or metric
+# -------------------------------
+def _warm_cool_rgb(norm01: float) -> str:
+    x = max(0.0, min(1.0, float(norm01)))
+    hue = (240.0 - 220.0 * x) / 360.0  # blue -> orange/red
+    r, g, b = colorsys.hsv_to_rgb(hue, 0.85, 0.95)
+    return f"rgb({int(r*255)},{int(g*255)},{int(b*255)})"
+
+
+def wordcloud_inputs(corpus, size_metric: str, color_metric: str) -> Tuple[dict, dict]:
+    """(size_weights, color_map) for a metric pair from a HookCorpus."""
+    stats = corpus.word_stats(size_metric)
+
+    # SIZE: engagement weights from size_metric
+    metric_map = dict(zip(stats["word"], stats["metric_avg"]))
+    size_weights = {w: math.log1p(max(0.0, float(v))) for w, v in metric_map.items()}
+
+    # COLOR: either frequency or another metric
+    if color_metric == "Frequency":
+        color_map = dict(zip(stats["word"], stats["freq"]))
+    else:
+        color_stats = corpus.word_stats(color_metric)
+        color_map = dict(zip(color_stats["word"], color_stats["metric_avg"]))
+    return size_weights, color_map
+
+
+def render_wordcloud_png(size_weights: dict, color_map: dict) -> bytes:
+    """Lay out and colour one word cloud; returns encoded PNG bytes."""
+    from wordcloud import WordCloud  # only paid for by the Semantics page
+
+    cmin = float(min(color_map.values())) if color_map else 0
+    cmax = float(max(color_map.values())) if color_map else 0
+    cden = (cmax - cmin) if (cmax - cmin) != 0 else 1.0
+
+    def color_func(word, font_size, position, orientation, random_state=None, **kwargs):
+        c = float(color_map.get(word, cmin))
+        norm = (c - cmin) / cden
+        return _warm_cool_rgb(norm)
+
+    wc = WordCloud(
+        width=1400,
+        height=700,
+        background_color="white",
+        collocations=False,
+        prefer_horizontal=0.95,
+    ).generate_from_frequencies(size_weights)
+
+    wc = wc.recolor(color_func=color_func)
+
+    buf = io.BytesIO()
+    wc.to_image().save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+# -------------------------------
+# Render cache
+# -------------------------------
+class WordCloudCache:
+    """
+    Bounded cache of rendered word clouds keyed by (data version, size metric, color metric).
+
+    PNG bytes are kept in memory and served by digest at
+    WORDCLOUD_URL/<sha256>.png, so every variant has its own immutable URL
+    and the browser may cache it. Entries evicted from memory are spilled to
+    `spill_dir` (when set) and still served from there; at most
+    `max_spilled` files are kept there, counting those left by earlier runs.
+    """
+
+    def __init__(self, max_entries: int = 48, spill_dir: Optional[Path] = None, max_spilled: int = 512):
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.max_spilled = max_spilled
+        self.hits = 0
+        self.misses = 0
+        self._keys: Dict[tuple, str] = {}
+        self._digest_keys: Dict[str, Set[tuple]] = {}
+        self._png: "OrderedDict[str, bytes]" = OrderedDict()
+        self._spilled: "OrderedDict[str, Path]" = OrderedDict()
+        self._indexed = spill_dir is None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def url_for(digest: str) -> str:
+        return f"{WORDCLOUD_URL}/{digest}.png"
+
+    def lookup(self, key: tuple) -> Optional[str]:
+        """URL of a cached render, or None."""
+        with self._lock:
+            digest = self._keys.get(key)
+            if digest is not None and (digest in self._png or digest in self._spilled):
+                self.hits += 1
+                if digest in self._png:
+                    self._png.move_to_end(digest)
+                return self.url_for(digest)
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, png: bytes) -> str:
+        digest = hashlib.sha256(png).hexdigest()
+        with self._lock:
+            previous = self._keys.get(key)
+            if previous is not None and previous != digest:
+                self._digest_keys[previous].discard(key)
+            self._keys[key] = digest
+            self._digest_keys.setdefault(digest, set()).add(key)
+            self._png[digest] = png
+            self._png.move_to_end(digest)
+            evicted = []
+            while len(self._png) > self.max_entries:
+                evicted.append(self._png.popitem(last=False))
+        for old_digest, old_png in evicted:
+            if not self._spill(old_digest, old_png):
+                with self._lock:
+                    self._forget(old_digest)
+        return self.url_for(digest)
+
+    def get_or_render(self, key: tuple, render: Callable[[], bytes]) -> str:
+        url = self.lookup(key)
+        if url is None:
+            url = self.put(key, render())
+        return url
+
+    def _forget(self, digest: str):
+        """Drop the keys of a digest that is neither in memory nor spilled. Call with the lock held."""
+        if digest in self._png or digest in self._spilled:
+            return
+        for key in self._digest_keys.pop(digest, ()):
+            if self._keys.get(key) == digest:
+                del self._keys[key]
+
+    def _index_spill_dir(self):
+        """
+        Adopt PNGs spilled by earlier runs, oldest first, so `max_spilled`
+        bounds the whole directory. Done on first use rather than in
+        __init__: pool workers import this module and must not touch it.
+        """
+        with self._lock:
+            if self._indexed:
+                return
+            self._indexed = True
+            try:
+                found = sorted(self.spill_dir.glob("*.png"), key=lambda p: p.stat().st_mtime)
+            except OSError:
+                found = []
+            for path in found:
+                self._spilled.setdefault(path.stem, path)
+            self._trim_spilled()
+
+    def _trim_spilled(self):
+        while len(self._spilled) > self.max_spilled:
+            old_digest, old = self._spilled.popitem(last=False)
+            old.unlink(missing_ok=True)
+            self._forget(old_digest)
+
+    def _spill(self, digest: str, png: bytes) -> bool:
+        if self.spill_dir is None:
+            return False
+        self._index_spill_dir()
+        path = self.spill_dir / f"{digest}.png"
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            if not path.exists():
+                path.write_bytes(png)
+        except OSError as e:
+            print(f"Word cloud spill failed: {e}")
+            return False
+        with self._lock:
+            self._spilled[digest] = path
+            self._spilled.move_to_end(digest)
+            self._trim_spilled()
+        return True
+
+    def read(self, digest: str):
+        """PNG bytes (in memory) or a spill file path for a digest; None if unknown."""
+        if not self._indexed:
+            self._index_spill_dir()
+        with self._lock:
+            png = self._png.get(digest)
+            if png is not None:
+                return png
+            return self._spilled.get(digest)
+
+    def blueprint(self) -> Blueprint:
+        bp = Blueprint("wordcloud_cache", __name__)
+
+        @bp.route(f"{WORDCLOUD_URL}/<digest>.png")
+        def _serve(digest):
+            found = self.read(digest)
+            if found is None:
+                abort(404)
+            if isinstance(found, Path):
+                resp = send_file(found, mimetype="image/png")
+            else:
+                resp = Response(found, mimetype="image/png")
+            # Content-addressed: a digest's bytes never change
+            resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            return resp
+
+        return bp
+
+
+WORDCLOUD_CACHE = WordCloudCache(
+    max_entries=int(os.getenv("WORDCLOUD_CACHE_SIZE", 48)),
+    spill_dir=SNAPSHOT_DIR / "wordclouds",
+)
+
+
+# -------------------------------
+# Background pre-rendering
+# -------------------------------
+class WordCloudWarmer:
+    """
+    Pre-renders every (size, colour) combination for the current corpus.
+
+    Jobs run in a process pool (see data/worker_pool.py; rendering holds
+    the GIL, so threads would not overlap) and land in the cache as they
+    finish. Only each job's word weights are sent to the workers. Starting
+    a new corpus cancels the queued jobs of the previous one.
+    """
+
+    def __init__(self, cache: WordCloudCache, workers: int = 2):
+        self.cache = cache
+        self.workers = max(1, workers)
+        self._executor: Optional[Executor] = None
+        self._futures: Dict[tuple, Future] = {}
+        self._version: Optional[str] = None
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=worker_context())
+        return self._executor
+
+    def warm(self, corpus, combos: Iterable[Tuple[str, str]], first: Optional[Tuple[str, str]] = None):
+        """Queue every combination not cached yet, `first` ahead of the rest."""
+        combos = list(dict.fromkeys(([first] if first else []) + list(combos)))
+        with self._lock:
+            if corpus.version == self._version:
+                return  # already queued for this corpus
+            for fut in self._futures.values():
+                fut.cancel()
+            self._futures = {}
+            self._version = corpus.version
+            self._total = len(combos)
+            if corpus.empty:
+                return
+            pool = self._pool()
+            for size_metric, color_metric in combos:
+                key = (corpus.version, size_metric, color_metric)
+                if self.cache.lookup(key) is not None:
+                    continue
+                fut = pool.submit(render_wordcloud_png, *wordcloud_inputs(corpus, size_metric, color_metric))
+                fut.add_done_callback(lambda f, key=key: self._store(key, f))
+                self._futures[key] = fut
+
+    def _store(self, key: tuple, fut: Future):
+        if fut.cancelled():
+            return
+        try:
+            self.cache.put(key, fut.result())
+        except Exception as e:
+            print(f"Word cloud pre-render failed for {key[1:]}: {e}")
+
+    def pending(self, key: tuple) -> Optional[Future]:
+        with self._lock:
+            fut = self._futures.get(key)
+        return fut if fut is not None and not fut.done() else None
+
+    def render_url(self, corpus, size_metric: str, color_metric: str) -> str:
+        """Cached URL for a pair, waiting for its queued job or rendering inline if there is none."""
+        key = (corpus.version, size_metric, color_metric)
+        url = self.cache.lookup(key)
+        if url is not None:
+            return url
+        fut = self.pending(key)
+        try:
+            png = fut.result() if fut is not None else None
+        except Exception:
+            png = None
+        if png is None:
+            png = render_wordcloud_png(*wordcloud_inputs(corpus, size_metric, color_metric))
+        return self.cache.put(key, png)
+
+    def status(self) -> str:
+        with self._lock:
+            waiting = sum(1 for f in self._futures.values() if not f.done())
+            total = self._total
+        if not total or not waiting:
+            return ""
+        return f"Pre-rendering word clouds: {total - waiting}/{total} ready"
+
+
+WORDCLOUD_WARMER = WordCloudWarmer(
+    WORDCLOUD_CACHE,
+    workers=int(os.getenv("WORDCLOUD_WORKERS", max(1, min(2, (os.cpu_count() or 1) - 1)))),
+)
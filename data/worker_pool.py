@@ -0,0 +1,32 @@
+# data/worker_pool.py
+# Start method for the CPU-bound process pools (word clouds, hook tagging).
+from __future__ import annotations
+import multiprocessing
+import threading
+
+# Imported once by the fork server, so its children start with them loaded
+_PRELOAD = ["data.hook_nlp", "data.wordcloud_cache"]
+_LOCK = threading.Lock()
+_CONTEXT = None
+
+
+def worker_context():
+    """
+    forkserver where available, else spawn; never a plain fork.
+
+    The app forks nothing itself: it runs Flask, refresh and scheduler
+    threads, and a fork taken while one of them holds a lock (logging,
+    pyarrow, the request limiter) can deadlock the child, which would also
+    start with a copy of every loaded frame. Fork-server children fork
+    from a single-threaded process holding only _PRELOAD, so work
+    functions must be top-level and their arguments picklable.
+    """
+    global _CONTEXT
+    with _LOCK:
+        if _CONTEXT is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                _CONTEXT = multiprocessing.get_context("forkserver")
+                _CONTEXT.set_forkserver_preload(_PRELOAD)
+            else:
+                _CONTEXT = multiprocessing.get_context("spawn")
+        return _CONTEXT
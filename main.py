@@ -1,21 +1,21 @@
 import os
-import math
-import re
-import colorsys
-import unicodedata
+import threading
+import time
 import pandas as pd
-from taipy.gui import Gui
+from taipy.gui import Gui, get_module_context, get_state_id, invoke_callback, invoke_long_callback
 from data.config_loader import get_airtable_config
-from data.airtable_fetch import fetch_all_tables
+from data.airtable_fetch import fetch_all_tables, fetch_errors, latest_watermark, project_fields, seed_sync_cache
+from data.snapshot import load_snapshots, save_snapshots
+from data.dataset import EMPTY_DATASET, Dataset, SingleFlight, build_dataset
+from data.scheduler import RefreshScheduler
+from data.view_cache import VIEW_CACHE
+from data.chart_data import chart_decimator
+from data.leaderboard import ALL_CONTENT_TYPES, LEADERBOARD_COLUMNS, LEADERBOARD_METRICS
+from data.rollup import GRANULARITIES
+from data.wordcloud_cache import WORDCLOUD_CACHE, WORDCLOUD_WARMER
 from zoneinfo import ZoneInfo  # stdlib tz, no extra dependency
 from datetime import datetime
-
-import nltk
-from nltk.data import find
-from nltk.corpus import wordnet
-from nltk.stem import WordNetLemmatizer
-
-from wordcloud import WordCloud
+from flask import Flask
 
 
 # -------------------------------
@@ -26,8 +26,24 @@ error_message = ""
 account_data = pd.DataFrame(columns=["Date", "Reach", "Lifetime Follower Count"])
 posts_data = pd.DataFrame(columns=["Post ID", "Likes Count", "Reach", "Saves", "Timestamp"])
 
+# Chart data: only the plotted columns; long series are LTTB-decimated to
+# CHART_POINT_BUDGET points per request and refined when the user zooms
+engagement_chart_data = pd.DataFrame(columns=["Timestamp", "Engagement Rate"])
+growth_chart_data = pd.DataFrame(columns=["Date", "Reach", "Lifetime Follower Count"])
+reach_by_day_data = pd.DataFrame(columns=["Day", "Reach"])
+# One decimator per single-series chart: Taipy applies a decimator's
+# keep-mask to the whole frame, so a series sharing a chart would be
+# thinned by another series' shape
+engagement_decimator = chart_decimator()
+reach_decimator = chart_decimator()
+followers_decimator = chart_decimator()
+
 selected_post = ""
-post_options = []
+# Post selector: one page of search results at a time (see data/post_search.py)
+post_query = ""
+post_page = 0
+post_page_options = []
+post_page_str = ""
 
 post_likes = 0
 post_reach = 0
@@ -42,17 +58,39 @@ total_posts = 0
 total_likes = 0
 
 # Aggregation controls
-agg_granularity = "Day"  # Day | Week
+agg_granularity = "Day"
+agg_granularity_lov = list(GRANULARITIES)
 date_start = ""          # YYYY-MM-DD
 date_end = ""            # YYYY-MM-DD
 agg_engagement_over_time = pd.DataFrame(columns=["Date", "Engagement Rate"])
 
+# Top performers controls
+top_metric = "Engagement Rate"
+top_metric_lov = list(LEADERBOARD_METRICS)
+top_content_type = ALL_CONTENT_TYPES
+top_content_type_lov = [ALL_CONTENT_TYPES]
+top_date_start = ""      # YYYY-MM-DD
+top_date_end = ""        # YYYY-MM-DD
+top_posts = pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+
 APP_TZ = ZoneInfo("America/Sao_Paulo")  # display timezone
 last_updated_str = "—"
+table_sync_str = ""  # last sync time per table
 
 is_refreshing = False
 refresh_status = ""
 
+# The published data load. Refreshes build a new Dataset in the background and
+# swap this reference; sessions are then re-bound to it (see publish_dataset).
+dataset = EMPTY_DATASET
+dataset_version = 0  # version a session is bound to
+REFRESH = SingleFlight("refresh")
+app = None  # the Gui, once running
+
+_SESSIONS = {}  # state id -> [module context, last seen connected], for refresh notifications
+_SESSIONS_LOCK = threading.Lock()
+SESSION_TTL = 600  # seconds a session may go without an open websocket before it is dropped
+
 # -------------------------------
 # Semantics / Hook word cloud state
 # -------------------------------
@@ -74,279 +112,19 @@ hook_color_lov = [
     "Average Watch Time",
 ]
 
-hook_wordcloud_path = ""  # generated PNG
+hook_wordcloud_path = ""  # content-addressed URL of the rendered PNG
+hook_wordcloud_status = ""  # shown while hooks are analysed or a cold size/colour pair renders
+semantics_opened = False  # session has visited the Semantics page
 hook_top_words = pd.DataFrame(columns=["word", "freq", "metric_avg"])
 
 
-# -------------------------------
-# Helpers
-# -------------------------------
-def nz(x, default=0):
-    """Return default for None/NaN; otherwise x."""
-    try:
-        if x is None:
-            return default
-        if isinstance(x, float) and math.isnan(x):
-            return default
-        return x
-    except Exception:
-        return default
-
-
-# -------------------------------
-# Semantics helpers (emoji stripping + EN lemmatization + custom remove list)
-# -------------------------------
-def _ensure_nltk():
-    # wordnet for English lemmatization
-    try:
-        find("corpora/wordnet")
-    except LookupError:
-        nltk.download("wordnet", quiet=True)
-
-    # wordnet multi-lingual index (often used by wordnet)
-    try:
-        find("corpora/omw-1.4")
-    except LookupError:
-        nltk.download("omw-1.4", quiet=True)
-
-    # POS tagger for better lemmatization
-    try:
-        find("taggers/averaged_perceptron_tagger")
-    except LookupError:
-        nltk.download("averaged_perceptron_tagger", quiet=True)
-
-_ensure_nltk()
-_LEMMATIZER = WordNetLemmatizer()
-
-# REMOVE: articles, most prepositions, generic linking/filler
-REMOVE_WORDS = set([
-    # Portuguese articles/determiners
-    "a", "o", "as", "os", "um", "uma", "uns", "umas",
-    "ao", "aos", "à", "às", "da", "das", "do", "dos",
-    "no", "na", "nos", "nas",
-    "num", "numa", "nuns", "numas",
-
-    # Portuguese prepositions (most)
-    "de", "em", "para", "pra", "com", "por", "sem", "sobre", "entre", "até",
-    "contra", "desde", "perante", "após", "antes", "durante",
-
-    # Generic linking/filler
-    "e", "ou", "mas", "porém", "pois", "então", "daí", "assim", "tipo", "né", "eh", "aí", "ai",
-
-    # English articles/prepositions/linkers
-    "the", "a", "an",
-    "to", "of", "in", "on", "for", "with", "from", "by", "at", "into", "onto", "over", "under",
-    "between", "through", "during", "before", "after", "without", "against", "about", "around",
-    "and", "or", "but", "so", "then",
-])
-
-# KEEP: pronouns + question words + hook-critical
-KEEP_WORDS = set([
-    # Portuguese pronouns/direct address
-    "você", "vocês", "vc", "vcs", "eu", "nós",
-
-    # Portuguese question words / forms
-    "como", "quando", "onde", "qual", "quais", "quem", "que", "quê",
-    "por_que", "o_que", "pra_que", "para_que",
-
-    # English pronouns/question words
-    "you", "your", "i", "we", "my", "me", "our",
-    "why", "how", "what", "when", "where", "which", "who",
-])
-
-QUESTION_PHRASES = {
-    ("por", "que"): "por_que",
-    ("o", "que"): "o_que",
-    ("pra", "que"): "pra_que",
-    ("para", "que"): "para_que",
-}
-
-def _strip_emojis(text: str) -> str:
-    if not isinstance(text, str) or not text:
-        return ""
-    out = []
-    for ch in text:
-        cp = ord(ch)
-        if (
-            0x1F300 <= cp <= 0x1FAFF
-            or 0x2600 <= cp <= 0x26FF
-            or 0x2700 <= cp <= 0x27BF
-            or 0xFE00 <= cp <= 0xFE0F
-            or 0x1F1E6 <= cp <= 0x1F1FF
-            or cp == 0x200D
-        ):
-            continue
-        if unicodedata.category(ch) == "So":
-            continue
-        out.append(ch)
-    return "".join(out)
-
-def _nltk_pos_to_wordnet(tag: str):
-    if not tag:
-        return wordnet.NOUN
-    if tag.startswith("V"):
-        return wordnet.VERB
-    if tag.startswith("J"):
-        return wordnet.ADJ
-    if tag.startswith("R"):
-        return wordnet.ADV
-    return wordnet.NOUN
-
-def _fold_question_phrases(tokens):
-    out = []
-    i = 0
-    while i < len(tokens):
-        if i + 1 < len(tokens):
-            pair = (tokens[i], tokens[i + 1])
-            if pair in QUESTION_PHRASES:
-                out.append(QUESTION_PHRASES[pair])
-                i += 2
-                continue
-        out.append(tokens[i])
-        i += 1
-    return out
-
-def _should_remove(tok: str) -> bool:
-    if tok in KEEP_WORDS:
-        return False
-    return tok in REMOVE_WORDS
-
-def _is_mostly_ascii(token: str) -> bool:
-    if not token:
-        return True
-    ascii_count = sum(1 for c in token if ord(c) < 128)
-    return (ascii_count / max(1, len(token))) >= 0.9
-
-def _tokenize_hook_text(text: str):
-    if not isinstance(text, str):
-        return []
-
-    text = _strip_emojis(text).strip().lower()
-    if not text:
-        return []
-
-    text = re.sub(r"https?://\S+|www\.\S+", " ", text)
-    raw_tokens = re.findall(r"[a-zà-öø-ÿ']+", text, flags=re.IGNORECASE)
-
-    tokens = []
-    for t in raw_tokens:
-        t = t.strip("'")
-        if len(t) < 2:
-            continue
-        tokens.append(t)
-
-    if not tokens:
-        return []
-
-    tokens = _fold_question_phrases(tokens)
-
-    try:
-        tagged = nltk.pos_tag(tokens)
-    except Exception:
-        tagged = [(t, "") for t in tokens]
-
-    out = []
-    for tok, pos in tagged:
-        if tok in QUESTION_PHRASES.values():
-            out.append(tok)
-            continue
-
-        if _should_remove(tok):
-            continue
-
-        norm = tok
-        # Only English lemmatization; PT kept as-is
-        if _is_mostly_ascii(tok):
-            norm = _LEMMATIZER.lemmatize(tok, _nltk_pos_to_wordnet(pos))
-
-        if len(norm) < 2:
-            continue
-        out.append(norm)
-
-    return out
-
-
-# -------------------------------
-# Engagement mapping (for dropdown)
-# -------------------------------
-def _get_metric_value(row, metric_name: str) -> float:
-    likes = float(nz(row.get("Likes Count", 0), 0) or 0)
-    aud = float(nz(row.get("Audience Comments Count", 0), 0) or 0)
-    awt = float(nz(row.get("Average Watch Time", 0), 0) or 0)
-
-    if metric_name == "Likes":
-        return likes
-    if metric_name == "Audience Comments":
-        return aud
-    if metric_name == "Likes + Audience Comments":
-        return likes + aud
-    if metric_name == "Average Watch Time":
-        return awt
-    return likes
-
-
-# -------------------------------
-# Hook stats builder (required by generate_hook_wordcloud)
-# -------------------------------
-def _build_hook_word_stats(df: pd.DataFrame, metric_name: str) -> pd.DataFrame:
-    """
-    Returns dataframe: word, freq, metric_avg
-
-    freq:
-      Token frequency across hooks (counts repeated occurrences within a hook).
-    metric_avg:
-      Average engagement metric across posts that contain the word
-      (counts a word at most once per post for the average).
-    """
-    if df.empty:
-        return pd.DataFrame(columns=["word", "freq", "metric_avg"])
-
-    freq = {}
-    metric_sum = {}
-    metric_cnt = {}
-
-    for _, row in df.iterrows():
-        tokens = _tokenize_hook_text(row.get("Hook Text", ""))
-        if not tokens:
-            continue
-
-        # frequency counts (each occurrence)
-        for t in tokens:
-            freq[t] = freq.get(t, 0) + 1
-
-        mval = _get_metric_value(row, metric_name)
-
-        # metric averages (unique per post)
-        for t in set(tokens):
-            metric_sum[t] = metric_sum.get(t, 0.0) + float(mval)
-            metric_cnt[t] = metric_cnt.get(t, 0) + 1
-
-    rows = []
-    for w, f in freq.items():
-        cnt = metric_cnt.get(w, 0)
-        avg = (metric_sum.get(w, 0.0) / cnt) if cnt else 0.0
-        rows.append((w, int(f), float(avg)))
-
-    out = pd.DataFrame(rows, columns=["word", "freq", "metric_avg"])
-    # Keep the existing sort for other uses; table sort is handled separately.
-    out = out.sort_values(["freq", "metric_avg"], ascending=[False, False]).reset_index(drop=True)
-    return out
-
-
 # -------------------------------
 # Word cloud generation
-# SIZE BY engagement metric, COLOR BY frequency or metric
 # -------------------------------
-def _warm_cool_rgb(norm01: float) -> str:
-    x = max(0.0, min(1.0, float(norm01)))
-    hue = (240.0 - 220.0 * x) / 360.0  # blue -> orange/red
-    r, g, b = colorsys.hsv_to_rgb(hue, 0.85, 0.95)
-    return f"rgb({int(r*255)},{int(g*255)},{int(b*255)})"
-
 def generate_hook_wordcloud(size_metric: str, color_metric: str, state=None):
-    global hook_wordcloud_path, hook_top_words, posts_data
+    global hook_wordcloud_path, hook_top_words
 
-    if posts_data is None or posts_data.empty:
+    if dataset.posts_data.empty:
         hook_wordcloud_path = ""
         hook_top_words = pd.DataFrame(columns=["word", "freq", "metric_avg"])
         if state:
@@ -354,104 +132,123 @@ def generate_hook_wordcloud(size_metric: str, color_metric: str, state=None):
             state.hook_top_words = hook_top_words
         return
 
-    df = posts_data.copy()
-
-    # Only VIDEO + non-empty Hook Text
-    if "Content Type" in df.columns:
-        df = df[df["Content Type"].astype(str).str.upper() == "VIDEO"]
-    if "Hook Text" in df.columns:
-        df = df[df["Hook Text"].astype(str).str.strip().ne("")]
-    else:
-        df = df.iloc[0:0]
-
-    stats = _build_hook_word_stats(df, size_metric)
+    # Word stats for every metric come from the corpus built once per data load
+    corpus = dataset.hook_corpus.get()
+    stats = corpus.word_stats(size_metric)
 
     # Top hook words table: top 5 by the selected size metric
-    hook_top_words = stats.sort_values("metric_avg", ascending=False).head(5).copy()
+    hook_top_words = VIEW_CACHE.get(
+        dataset.posts_fingerprint, "hook_top_words", (size_metric,),
+        lambda: stats.sort_values("metric_avg", ascending=False).head(5).copy(),
+    )
 
     if stats.empty:
         hook_wordcloud_path = ""
-        if state:
-            state.hook_wordcloud_path = hook_wordcloud_path
-            state.hook_top_words = hook_top_words
-        return
-
-    # SIZE: engagement weights from size_metric
-    metric_map = dict(zip(stats["word"], stats["metric_avg"]))
-    size_weights = {w: math.log1p(max(0.0, float(v))) for w, v in metric_map.items()}
-
-    # COLOR: either frequency or another metric
-    if color_metric == "Frequency":
-        color_map = dict(zip(stats["word"], stats["freq"]))
     else:
-        # Need to compute stats for the color metric
-        color_stats = _build_hook_word_stats(df, color_metric)
-        color_map = dict(zip(color_stats["word"], color_stats["metric_avg"]))
+        # Rendered once per (data version, size, colour); served from memory by digest
+        hook_wordcloud_path = WORDCLOUD_WARMER.render_url(corpus, size_metric, color_metric)
 
-    cmin = float(min(color_map.values())) if color_map else 0
-    cmax = float(max(color_map.values())) if color_map else 0
-    cden = (cmax - cmin) if (cmax - cmin) != 0 else 1.0
+    if state:
+        state.hook_wordcloud_path = hook_wordcloud_path
+        state.hook_top_words = hook_top_words
 
-    def color_func(word, font_size, position, orientation, random_state=None, **kwargs):
-        c = float(color_map.get(word, cmin))
-        norm = (c - cmin) / cden
-        return _warm_cool_rgb(norm)
 
-    wc = WordCloud(
-        width=1400,
-        height=700,
-        background_color="white",
-        collocations=False,
-        prefer_horizontal=0.95,
-    ).generate_from_frequencies(size_weights)
+def _render_hook_wordcloud(size_metric: str, color_metric: str):
+    """Long-callback body: wait for the pre-render of this pair, or render it here."""
+    return WORDCLOUD_WARMER.render_url(dataset.hook_corpus.get(), size_metric, color_metric)
 
-    wc = wc.recolor(color_func=color_func)
 
-    out_path = os.path.join(os.getcwd(), "hook_wordcloud.png")
-    wc.to_file(out_path)
+def _on_hook_wordcloud_rendered(state, status, size_metric: str, color_metric: str, url=None):
+    # Taipy appends the long callback's return value (None while still running)
+    if isinstance(status, bool):
+        state.hook_wordcloud_status = "" if status else "⚠️ Word cloud rendering failed"
+        # The user may have moved on to another pair meanwhile
+        if status and (state.hook_size_metric, state.hook_color_metric) == (size_metric, color_metric):
+            generate_hook_wordcloud(size_metric, color_metric, state=state)
 
-    # Add timestamp to break browser cache
-    import time
-    hook_wordcloud_path = f"hook_wordcloud.png?t={int(time.time())}"
 
-    if state:
-        state.hook_wordcloud_path = hook_wordcloud_path
-        state.hook_top_words = hook_top_words
+def _show_hook_wordcloud(state):
+    """Bind the selected pair's cloud if it is rendered; otherwise render it off the request thread."""
+    corpus = dataset.hook_corpus.get()
+    key = (corpus.version, state.hook_size_metric, state.hook_color_metric)
+    if corpus.empty or WORDCLOUD_CACHE.lookup(key) is not None:
+        generate_hook_wordcloud(state.hook_size_metric, state.hook_color_metric, state=state)
+        state.hook_wordcloud_status = WORDCLOUD_WARMER.status()
+        return
+
+    # Cold pair: keep the page responsive and swap the image in when it's ready
+    state.hook_wordcloud_status = "⏳ Rendering this combination…"
+    invoke_long_callback(
+        state,
+        _render_hook_wordcloud, [state.hook_size_metric, state.hook_color_metric],
+        _on_hook_wordcloud_rendered, [state.hook_size_metric, state.hook_color_metric],
+    )
 
 
 def update_hook_wordcloud(state):
     global hook_size_metric, hook_color_metric
     hook_size_metric = state.hook_size_metric
     hook_color_metric = state.hook_color_metric
-    generate_hook_wordcloud(hook_size_metric, hook_color_metric, state=state)
+
+    if not dataset.hook_corpus.ready:
+        open_semantics(state)
+        return
+    _show_hook_wordcloud(state)
+
+
+def warm_hook_wordclouds(size_metric: str, color_metric: str):
+    """Queue all size x colour renders for the current corpus, current selection first."""
+    combos = [(s, c) for s in hook_size_lov for c in hook_color_lov]
+    WORDCLOUD_WARMER.warm(dataset.hook_corpus.get(), combos, first=(size_metric, color_metric))
+
+
+def _load_hook_corpus(size_metric: str, color_metric: str):
+    """Long-callback body: tokenize the hooks (loading NLTK on first use) and queue the renders."""
+    dataset.hook_corpus.get()
+    warm_hook_wordclouds(size_metric, color_metric)
+
+
+def _on_hook_corpus_loaded(state, status, result=None):
+    if isinstance(status, bool):
+        if status:
+            _show_hook_wordcloud(state)
+        else:
+            state.hook_wordcloud_status = "⚠️ Hook analysis failed"
+
+
+def open_semantics(state):
+    """Show the Semantics page's data, building the hook corpus in the background if needed."""
+    state.semantics_opened = True
+    if not state.hook_size_metric:
+        state.hook_size_metric = hook_size_metric
+    if not state.hook_color_metric:
+        state.hook_color_metric = hook_color_metric
+    if dataset.hook_corpus.ready:
+        # A pair that isn't rendered yet shows the placeholder; the page never waits on a render
+        _show_hook_wordcloud(state)
+        return
+    state.hook_wordcloud_status = "⏳ Analysing hook texts…"
+    invoke_long_callback(
+        state,
+        _load_hook_corpus, [state.hook_size_metric, state.hook_color_metric],
+        _on_hook_corpus_loaded, [],
+    )
+
+
+def on_navigate(state, page_name):
+    _register_session(state)
+    # Only the Semantics page needs NLTK and the word clouds
+    if page_name == "Semantics_Sentiment":
+        open_semantics(state)
+    return page_name
 
 
 # -------------------------------
 # Engagement / Post metrics helpers
 # -------------------------------
-def calculate_engagement_rate(row):
-    try:
-        audience_comments = float(nz(row.get("Audience Comments Count", 0)))
-        likes = float(nz(row.get("Likes Count", 0)))
-        saves = float(nz(row.get("Saves", 0)))
-        reach = float(nz(row.get("Reach", 0)))
-        if reach > 0:
-            return round(((audience_comments + likes + saves) / reach) * 100, 2)
-        return 0.0
-    except Exception:
-        return 0.0
-
 def get_post_metrics(post_id):
-    if posts_data.empty or str(post_id) not in posts_data.get("Post ID", []).astype(str).tolist():
-        return 0, 0, 0, 0, 0.0
-    row = posts_data[posts_data["Post ID"].astype(str) == str(post_id)].iloc[0]
-    return (
-        int(nz(row.get("Likes Count", 0))),
-        int(nz(row.get("Reach", 0))),
-        int(nz(row.get("Saves", 0))),
-        int(nz(row.get("Audience Comments Count", 0))),
-        float(nz(row.get("Engagement Rate", 0.0))),
-    )
+    # O(1) lookup in the index rebuilt with each data load
+    return tuple(dataset.post_index.metrics(post_id))
 
 def _parse_date(s):
     try:
@@ -461,47 +258,21 @@ def _parse_date(s):
 
 def recompute_agg(state=None):
     global agg_engagement_over_time
-    df = posts_data.copy()
-    agg_engagement_over_time = pd.DataFrame(columns=["Date", "Engagement Rate"])
-
-    if df.empty or "Timestamp" not in df.columns:
-        if state is not None:
-            state.agg_engagement_over_time = agg_engagement_over_time
-        return
-
-    df["__dt"] = pd.to_datetime(df["Timestamp"], errors="coerce")
-    df = df.dropna(subset=["__dt"])
-
-    _start = _parse_date(state.date_start if state is not None else date_start)
-    _end = _parse_date(state.date_end if state is not None else date_end)
-    if _start:
-        df = df[df["__dt"].dt.date >= _start]
-    if _end:
-        df = df[df["__dt"].dt.date <= _end]
-
-    gran = (state.agg_granularity if state is not None else agg_granularity) or "Day"
-    if gran == "Week":
-        key = df["__dt"].dt.to_period("W").apply(lambda p: p.start_time.date())
+    # Answered from the per-day rollup built once per data load
+    ds = dataset
+    rollup = ds.daily_rollup
+    if rollup is None or rollup.empty:
+        agg_engagement_over_time = pd.DataFrame(columns=["Date", "Engagement Rate"])
     else:
-        key = df["__dt"].dt.date
-
-    group = df.groupby(key).agg(
-        {
-            "Likes Count": "sum",
-            "Audience Comments Count": "sum",
-            "Saves": "sum",
-            "Reach": "sum",
-        }
-    ).reset_index()
-    group = group.rename(columns={group.columns[0]: "Date"})
-
-    if len(group) > 0:
-        group["Engagement Rate"] = (
-            (group.get("Likes Count", 0) + group.get("Audience Comments Count", 0) + group.get("Saves", 0))
-            / group.get("Reach", 0).replace(0, pd.NA)
-        ) * 100
-        group["Engagement Rate"] = group["Engagement Rate"].fillna(0).round(2)
-        agg_engagement_over_time = group[["Date", "Engagement Rate"]]
+        args = (
+            _parse_date(state.date_start if state is not None else date_start),
+            _parse_date(state.date_end if state is not None else date_end),
+            (state.agg_granularity if state is not None else agg_granularity) or "Day",
+        )
+        # Shared by every session viewing the same window on these posts
+        agg_engagement_over_time = VIEW_CACHE.get(
+            ds.posts_fingerprint, "engagement_over_time", args, lambda: rollup.engagement_over_time(*args)
+        )
 
     if state is not None:
         state.agg_engagement_over_time = agg_engagement_over_time
@@ -509,6 +280,65 @@ def recompute_agg(state=None):
 def _on_agg_change(state):
     recompute_agg(state)
 
+def recompute_top_posts(state=None):
+    global top_posts
+    # Read off the per-metric rankings built once per data load
+    ds = dataset
+    board = ds.leaderboard
+    if board is None or board.empty:
+        top_posts = pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+    else:
+        metric, content_type, start, end = (
+            (state.top_metric if state is not None else top_metric) or "Engagement Rate",
+            (state.top_content_type if state is not None else top_content_type) or ALL_CONTENT_TYPES,
+            _parse_date(state.top_date_start if state is not None else top_date_start),
+            _parse_date(state.top_date_end if state is not None else top_date_end),
+        )
+        top_posts = VIEW_CACHE.get(
+            ds.posts_fingerprint, "top_posts", (metric, content_type, start, end),
+            lambda: board.top(metric, content_type=content_type, start=start, end=end),
+        )
+
+    if state is not None:
+        state.top_posts = top_posts
+
+def _on_top_change(state):
+    recompute_top_posts(state)
+
+def _search_page(ds: Dataset, query: str, page: int, selected: str = ""):
+    """(options, page, "x–y of n") for one page of the post selector, always listing `selected`."""
+    query = (query or "").strip()
+    # Shared by every session typing the same query on these posts
+    result = VIEW_CACHE.get(ds.posts_fingerprint, "post_search", (query, page), lambda: ds.post_search.page(query, page))
+    if result.total:
+        last = result.first + len(result.options) - 1
+        options, page, page_str = list(result.options), result.page, f"{result.first:,}–{last:,} of {result.total:,}"
+    else:
+        options, page, page_str = [], 0, "No posts match"
+    # The selector shows a value missing from its lov as blank, so the
+    # selected post stays listed (first) on pages it isn't on
+    pos = ds.post_index.position(selected) if selected else None
+    if pos is not None and all(pid != selected for pid, _ in options):
+        options.insert(0, ds.post_options[pos])
+    return options, page, page_str
+
+def search_posts(state):
+    state.post_page_options, state.post_page, state.post_page_str = _search_page(
+        dataset, state.post_query, state.post_page, state.selected_post
+    )
+
+def _on_post_query(state):
+    state.post_page = 0
+    search_posts(state)
+
+def prev_post_page(state):
+    state.post_page = max(0, state.post_page - 1)
+    search_posts(state)
+
+def next_post_page(state):
+    state.post_page = state.post_page + 1  # clamped to the last page by the search
+    search_posts(state)
+
 def fmt_int(n):
     try:
         return f"{int(n):,}"
@@ -528,216 +358,310 @@ def refresh_formats():
     post_comments_fmt = fmt_int(post_comments)
     total_likes_fmt = fmt_int(total_likes)
 
-def _latest_updated_at_str():
-    def _pick_col(df):
-        if df is None or df.empty:
-            return None
-        for name in ("Updated At", "Updated_at", "updated_at"):
-            if name in df.columns:
-                return name
-        return None
-
-    candidates = []
-    for df in (account_data, posts_data):
-        col = _pick_col(df)
-        if col:
-            s = pd.to_datetime(df[col], errors="coerce", utc=True)
-            s = s.dropna()
-            if not s.empty:
-                candidates.append(s.max())
-
-    if not candidates:
+def _latest_updated_at_str(ds: Dataset = None):
+    ds = dataset if ds is None else ds
+    if ds.updated_at is None:
         return "—"
+    return ds.updated_at.tz_convert(APP_TZ).strftime("%Y-%m-%d %H:%M %Z")
 
-    latest = max(candidates).tz_convert(APP_TZ)
-    return latest.strftime("%Y-%m-%d %H:%M %Z")
 
+# -------------------------------
+# Data loading / publishing
+# -------------------------------
+def _fetch_tables(cfg, incremental: bool, only=None):
+    """
+    Fetch the configured tables (or just the keys in `only`) and snapshot the changed ones.
 
-def reload_data(state=None):
-    global account_data, posts_data, total_posts, total_likes
-    global current_followers, latest_reach, profile_views
-    global post_options, selected_post, last_updated_str
+    Returns (frames, error message, keys whose data changed since their last sync).
+    """
+    all_data, fetch_stats = fetch_all_tables(
+        cfg["api_key"], cfg["base_id"], cfg["tables"],
+        incremental=incremental, max_concurrency=cfg["max_concurrency"], only=only, fields=cfg["fields"],
+    )
+    print("Fetch timings:", {k: v["seconds"] for k, v in fetch_stats.items() if v["mode"] != "cached"})
+    fetched = {k: all_data[k] for k, v in fetch_stats.items() if v["mode"] not in ("cached", "failed")}
+    changed = {k for k, df in fetched.items() if SCHEDULER.record(k, latest_watermark(df), len(df))}
+    # A table's first sync in this process always counts as changed, so its snapshot is rewritten once
+    save_snapshots(cfg["base_id"], {k: fetched[k] for k in changed}, cfg["tables"], cfg["fields"])
+    errors = fetch_errors(fetch_stats)
+    return all_data, (f"⚠️ {errors}" if errors else ""), changed
+
+
+def _table_sync_str():
+    synced = SCHEDULER.synced_at()
+    stale = SCHEDULER.stale()
+    parts = [
+        f"{_TABLE_LABELS.get(key, key)} {datetime.fromtimestamp(at, APP_TZ):%H:%M}" + (" ⚠️" if key in stale else "")
+        for key, at in sorted(synced.items())
+    ]
+    return ("Synced: " + " · ".join(parts)) if parts else ""
+
+
+def _bind_defaults(ds: Dataset):
+    """Module globals are the initial values of sessions that connect later."""
+    global error_message, account_data, posts_data, selected_post
+    global engagement_chart_data, growth_chart_data, reach_by_day_data
+    global total_posts, total_likes, current_followers, latest_reach, profile_views
     global post_likes, post_reach, post_saves, post_comments, post_engagement
-    global is_refreshing, refresh_status
+    global date_start, date_end, last_updated_str, dataset_version, table_sync_str
+    global top_content_type, top_content_type_lov, top_date_start, top_date_end
+    global post_page_options, post_page, post_page_str
+
+    dataset_version = ds.version
+    error_message = ds.error_message
+    account_data = ds.account_data
+    growth_chart_data = ds.growth_points
+    reach_by_day_data = ds.reach_by_day
+    current_followers = ds.current_followers
+    latest_reach = ds.latest_reach
+    profile_views = ds.profile_views
+
+    # The pipeline hands back the same posts frame when the posts table didn't change
+    if posts_data is not ds.posts_data:
+        posts_data = ds.posts_data
+        engagement_chart_data = ds.engagement_points
+        total_posts = ds.total_posts
+        total_likes = ds.total_likes
+        if ds.date_min:
+            date_start, date_end = ds.date_min, ds.date_max
+
+        if selected_post not in ds.post_index:
+            selected_post = ds.post_options[0][0] if ds.post_options else ""
+        post_page_options, post_page, post_page_str = _search_page(ds, post_query, post_page, selected_post)
+        (post_likes, post_reach, post_saves,
+         post_comments, post_engagement) = get_post_metrics(selected_post)
+        recompute_agg()
 
-    is_refreshing = True
-    refresh_status = "Refreshing…"
-    if state:
-        state.is_refreshing = True
-        state.refresh_status = refresh_status
+        top_content_type_lov = [ALL_CONTENT_TYPES, *ds.leaderboard.content_types]
+        if top_content_type not in top_content_type_lov:
+            top_content_type = ALL_CONTENT_TYPES
+        if ds.date_min:
+            top_date_start, top_date_end = ds.date_min, ds.date_max
+        recompute_top_posts()
+
+    refresh_formats()
+    last_updated_str = _latest_updated_at_str(ds)
+    table_sync_str = _table_sync_str()
+
+
+def _apply_dataset(state):
+    """Re-bind one session to the current dataset, keeping its own selections."""
+    ds = dataset
+    state.dataset_version = ds.version
+    state.error_message = ds.error_message
+    state.account_data = ds.account_data
+    state.growth_chart_data = ds.growth_points
+    state.reach_by_day_data = ds.reach_by_day
+    state.current_followers_fmt = fmt_int(ds.current_followers)
+    state.latest_reach_fmt = fmt_int(ds.latest_reach)
+    state.profile_views_fmt = fmt_int(ds.profile_views)
+    state.last_updated_str = _latest_updated_at_str(ds)
+    state.table_sync_str = table_sync_str
+
+    # Posts and semantics stay as they are when the posts table didn't change
+    if state.posts_data is ds.posts_data:
+        return
+    state.posts_data = ds.posts_data
+    state.engagement_chart_data = ds.engagement_points
+    state.total_posts = ds.total_posts
+    state.total_likes_fmt = fmt_int(ds.total_likes)
+
+    if not state.date_start:
+        state.date_start = ds.date_min
+    if not state.date_end:
+        state.date_end = ds.date_max
+    recompute_agg(state)
+
+    if state.selected_post not in ds.post_index:
+        state.selected_post = ds.post_options[0][0] if ds.post_options else ""
+    search_posts(state)
+    update_post_metrics(state)
+
+    state.top_content_type_lov = [ALL_CONTENT_TYPES, *ds.leaderboard.content_types]
+    if state.top_content_type not in state.top_content_type_lov:
+        state.top_content_type = ALL_CONTENT_TYPES
+    if not state.top_date_start:
+        state.top_date_start = ds.date_min
+    if not state.top_date_end:
+        state.top_date_end = ds.date_max
+    recompute_top_posts(state)
+
+    # The hook corpus is only built for sessions that look at it
+    if state.semantics_opened:
+        open_semantics(state)
+
+
+def _register_session(state):
+    with _SESSIONS_LOCK:
+        _SESSIONS[get_state_id(state)] = [get_module_context(state), time.monotonic()]
 
+
+def _session_connected(state_id: str) -> bool:
+    """
+    Whether a tab of this session has its websocket open (taipy-gui 3.1 has no disconnect hook).
+
+    Reads taipy-gui internals (pinned in requirements.txt); if they have
+    moved, or the server isn't up yet, the session is kept.
+    """
     try:
-        cfg = get_airtable_config()
-        all_data = fetch_all_tables(cfg["api_key"], cfg["base_id"], cfg["tables"])
-
-        # Account metrics
-        account_data = all_data.get("ig_accounts", pd.DataFrame())
-        if not account_data.empty and "Date" in account_data.columns:
-            account_data["Date"] = pd.to_datetime(account_data["Date"], errors="coerce")
-            account_data = account_data.sort_values("Date")
-            account_data["Day"] = account_data["Date"].dt.day_name()
-
-            if len(account_data) > 0:
-                last = account_data.iloc[-1]
-                current_followers = int(nz(last.get("Lifetime Follower Count", 0)))
-                latest_reach = int(nz(last.get("Reach", 0)))
-                profile_views = int(nz(last.get("Lifetime Profile Views", 0)))
-
-        # Posts
-        posts_data = all_data.get("ig_posts", pd.DataFrame())
-        if not posts_data.empty:
-            if "Timestamp" in posts_data.columns:
-                posts_data["Timestamp"] = pd.to_datetime(posts_data["Timestamp"], errors="coerce")
-                posts_data = posts_data.sort_values("Timestamp", ascending=False)
-
-            if "Post ID" in posts_data.columns:
-                posts_data["Post ID"] = posts_data["Post ID"].astype(str)
-
-            posts_data["Engagement Rate"] = posts_data.apply(calculate_engagement_rate, axis=1)
-
-            total_posts = len(posts_data)
-            if "Likes Count" in posts_data.columns:
-                total_likes = int(pd.to_numeric(posts_data["Likes Count"], errors="coerce").fillna(0).sum())
-
-            # init date window
-            try:
-                if "Timestamp" in posts_data.columns and len(posts_data) > 0:
-                    _dt = pd.to_datetime(posts_data["Timestamp"], errors="coerce").dropna()
-                    if _dt is not None and len(_dt) > 0:
-                        if state is None or not getattr(state, "date_start", ""):
-                            globals()["date_start"] = str(_dt.min().date())
-                        if state is None or not getattr(state, "date_end", ""):
-                            globals()["date_end"] = str(_dt.max().date())
-            except Exception as _e:
-                print("Date range init error (reload):", _e)
-
-            if "Display Label" not in posts_data.columns:
-                posts_data["Display Label"] = posts_data.apply(
-                    lambda r: f"{r.get('Content Type','POST')}: "
-                              f"{r['Timestamp'].strftime('%b %d, %Y') if pd.notna(r.get('Timestamp')) else 'No Date'}",
-                    axis=1
-                )
-
-            post_options = list(zip(posts_data["Post ID"].astype(str).tolist(),
-                                    posts_data["Display Label"].tolist()))
-
-            if state:
-                current_sel = getattr(state, "selected_post", "")
-                if current_sel not in posts_data["Post ID"].astype(str).tolist():
-                    state.selected_post = str(posts_data["Post ID"].iloc[0]) if len(posts_data) else ""
-                update_post_metrics(state)
-            else:
-                if selected_post not in posts_data["Post ID"].astype(str).tolist():
-                    selected_post = str(posts_data["Post ID"].iloc[0]) if len(posts_data) else ""
-                (post_likes, post_reach, post_saves,
-                 post_comments, post_engagement) = get_post_metrics(selected_post)
+        sids = app._Gui__client_id_2_sid.get(state_id, ())
+        manager = app._server._ws.server.manager
+        return any(manager.is_connected(sid, "/") for sid in sids)
+    except Exception:
+        return True  # can't tell: keep it
 
-        if state:
-            recompute_agg(state)
-        else:
-            recompute_agg()
 
-        refresh_formats()
+def _notify_sessions(callback):
+    """Run callback(state) for every connected session (from any thread)."""
+    if app is None:
+        return
+    now = time.monotonic()
+    with _SESSIONS_LOCK:
+        for state_id, entry in list(_SESSIONS.items()):
+            if _session_connected(state_id):
+                entry[1] = now
+            elif now - entry[1] > SESSION_TTL:
+                del _SESSIONS[state_id]  # closed tab; a reload registers again through on_navigate
+        sessions = [(state_id, entry[0]) for state_id, entry in _SESSIONS.items()]
+    for state_id, module_context in sessions:
+        invoke_callback(app, state_id, callback, [], module_context)
+
+
+def publish_dataset(ds: Dataset):
+    """Make `ds` the current data load and re-bind every session to it."""
+    global dataset, hook_wordcloud_path, hook_top_words
+    previous = dataset
+    dataset = ds  # single reference swap; readers see the old or the new load, never a mix
+    print("View cache:", VIEW_CACHE.report())
+    VIEW_CACHE.invalidate((ds.posts_fingerprint, ds.accounts_fingerprint))
+    _bind_defaults(ds)
+    if ds.hook_corpus is not previous.hook_corpus:
+        # Rebuilt lazily by open_semantics() for the new corpus
+        hook_wordcloud_path = ""
+        hook_top_words = pd.DataFrame(columns=["word", "freq", "metric_avg"])
+    _notify_sessions(_apply_dataset)
+
 
-        # Semantics
-        if state:
-            if not hasattr(state, "hook_size_metric") or not state.hook_size_metric:
-                state.hook_size_metric = hook_size_metric
-            if not hasattr(state, "hook_color_metric") or not state.hook_color_metric:
-                state.hook_color_metric = hook_color_metric
-            generate_hook_wordcloud(state.hook_size_metric, state.hook_color_metric, state=state)
-        else:
-            generate_hook_wordcloud(hook_size_metric, hook_color_metric)
+def _on_refresh_started(state):
+    state.is_refreshing = True
+    state.refresh_status = "Refreshing…" if dataset.version else "Loading data…"
+
+
+def _on_refresh_finished(state):
+    state.is_refreshing = False
+    state.refresh_status = ""
+    state.table_sync_str = table_sync_str
 
-        last_updated_str = _latest_updated_at_str()
-        if state:
-            state.last_updated_str = last_updated_str
 
+def _refresh_dataset(keys=None):
+    """
+    Background refresh: incremental fetch, build a new Dataset, publish it.
+
+    `keys` limits the fetch to those tables (scheduled refreshes); the new
+    dataset is then only published if one of them changed.
+    """
+    global table_sync_str
+    try:
+        _notify_sessions(_on_refresh_started)
+        # Only records modified since the last sync are pulled on refresh
+        started = time.perf_counter()
+        all_data, fetch_error, changed = _fetch_tables(get_airtable_config(), incremental=True, only=keys)
+        table_sync_str = _table_sync_str()
+        if keys is None or changed or fetch_error != dataset.error_message:
+            publish_dataset(build_dataset(all_data, fetch_error, time.perf_counter() - started))
     except Exception as e:
         print("Reload error:", e)
-
     finally:
-        is_refreshing = False
-        refresh_status = ""
-        if state:
-            state.is_refreshing = False
-            state.refresh_status = refresh_status
+        _notify_sessions(_on_refresh_finished)
+
+
+def _scheduled_refresh(keys):
+    # Joins a refresh already pending that covers these tables rather than queueing behind it
+    future, _ = REFRESH.submit(_refresh_dataset, keys, scope=keys)
+    future.result()
+
+
+# Auto-refresh per table on the intervals in airtable_config.yaml
+SCHEDULER = RefreshScheduler(_scheduled_refresh)
+_TABLE_LABELS = {"ig_posts": "posts", "ig_accounts": "account metrics"}
+
+
+def reload_data(state=None):
+    """
+    Start a background refresh, or join a full one already pending; one
+    running for only some tables gets a full refresh queued behind it.
+
+    The callback returns at once; every session is re-bound when the new
+    dataset is published.
+    """
+    _, started = REFRESH.submit(_refresh_dataset)
+    if state:
+        state.is_refreshing = True
+        state.refresh_status = "Refreshing…" if started else "Refresh already in progress…"
+
+
+def on_init(state):
+    _register_session(state)
+    # Module globals may lag a publish that happened while this page was loading
+    if state.dataset_version != dataset.version:
+        _apply_dataset(state)
+    if REFRESH.running():
+        _on_refresh_started(state)
+    else:
+        _on_refresh_finished(state)
 
 
 # -------------------------------
 # Initial data load
 # -------------------------------
-try:
-    cfg = get_airtable_config()
-    API_KEY = cfg["api_key"]
-    BASE_ID = cfg["base_id"]
-
-    all_data = fetch_all_tables(API_KEY, BASE_ID, cfg["tables"])
-
-    # Account metrics
-    account_data = all_data.get("ig_accounts", pd.DataFrame())
-    if not account_data.empty and "Date" in account_data.columns:
-        account_data["Date"] = pd.to_datetime(account_data["Date"], errors="coerce")
-        account_data = account_data.sort_values("Date")
-        account_data["Day"] = account_data["Date"].dt.day_name()
-
-        if len(account_data) > 0:
-            latest_row = account_data.iloc[-1]
-            current_followers = int(nz(latest_row.get("Lifetime Follower Count", 0)))
-            latest_reach = int(nz(latest_row.get("Reach", 0)))
-            profile_views = int(nz(latest_row.get("Lifetime Profile Views", 0)))
-
-    # Posts
-    posts_data = all_data.get("ig_posts", pd.DataFrame())
-    if not posts_data.empty:
-        if "Timestamp" in posts_data.columns:
-            posts_data["Timestamp"] = pd.to_datetime(posts_data["Timestamp"], errors="coerce")
-            posts_data = posts_data.sort_values("Timestamp", ascending=False)
-
-        if "Post ID" in posts_data.columns:
-            posts_data["Post ID"] = posts_data["Post ID"].astype(str)
-
-        posts_data["Engagement Rate"] = posts_data.apply(calculate_engagement_rate, axis=1)
-
-        total_posts = len(posts_data)
-        if "Likes Count" in posts_data.columns:
-            total_likes = int(pd.to_numeric(posts_data["Likes Count"], errors="coerce").fillna(0).sum())
-
-        try:
-            if "Timestamp" in posts_data.columns and len(posts_data) > 0:
-                _dt = pd.to_datetime(posts_data["Timestamp"], errors="coerce").dropna()
-                if _dt is not None and len(_dt) > 0:
-                    date_start = str(_dt.min().date())
-                    date_end = str(_dt.max().date())
-        except Exception as _e:
-            print("Date range init error:", _e)
-
-        if "Display Label" not in posts_data.columns:
-            posts_data["Display Label"] = posts_data.apply(
-                lambda row: f"{row.get('Content Type', 'POST')}: "
-                            f"{row['Timestamp'].strftime('%b %d, %Y') if pd.notna(row.get('Timestamp')) else 'No Date'}",
-                    axis=1
-                )
-
-        if "Post ID" in posts_data.columns:
-            post_options = list(zip(posts_data["Post ID"].astype(str).tolist(),
-                                    posts_data["Display Label"].tolist()))
-            selected_post = str(posts_data["Post ID"].iloc[0]) if len(posts_data) > 0 else ""
-            if selected_post:
-                (post_likes, post_reach, post_saves,
-                 post_comments, post_engagement) = get_post_metrics(selected_post)
+def _initial_load() -> bool:
+    """
+    First data load: the local snapshot when there is one, else a full fetch.
 
-        recompute_agg()
-        refresh_formats()
+    Returns True when a snapshot was served, i.e. it still needs revalidating
+    against Airtable.
+    """
+    try:
+        cfg = get_airtable_config()
+        SCHEDULER.set_intervals(cfg["refresh_intervals"], max_backoff=cfg["max_refresh_backoff"])
+
+        started = time.perf_counter()
+        snapshots = load_snapshots(cfg["base_id"], cfg["tables"], cfg["fields"])
+        if snapshots is not None:
+            all_data = {}
+            for key, (snap_df, watermark) in snapshots.items():
+                snap_df = project_fields(snap_df, cfg["fields"].get(key))
+                seed_sync_cache(cfg["base_id"], cfg["tables"][key], snap_df, watermark, cfg["fields"].get(key))
+                all_data[key] = snap_df.copy()
+            publish_dataset(build_dataset(all_data, fetch_seconds=time.perf_counter() - started))
+            return True
+
+        all_data, fetch_error, _ = _fetch_tables(cfg, incremental=False)
+        publish_dataset(build_dataset(all_data, fetch_error, time.perf_counter() - started))
+    except Exception as e:
+        print(f"✗ Error: {e}")
+        publish_dataset(dataset._replace(error_message=f"⚠️ {e}"))
+    return False
 
-        # Initial Semantics build so the tab isn't empty on first load
-        generate_hook_wordcloud(hook_size_metric, hook_color_metric)
 
-except Exception as e:
-    error_message = f"⚠️ {e}"
-    print(f"✗ Error: {e}")
+def _fast_start():
+    if _initial_load():
+        _refresh_dataset()
 
-last_updated_str = _latest_updated_at_str()
+
+# Fast start (default): the first load runs in the background, so the web
+# port binds at once; pages show placeholders until it publishes.
+# FAST_START=0 loads before serving, as before.
+FAST_START = os.getenv("FAST_START", "1") != "0"
+_bind_defaults(dataset)
+
+
+def start_data_load():
+    """First data load, started when the app runs; importing main fetches nothing."""
+    if FAST_START:
+        REFRESH.submit(_fast_start)
+    elif _initial_load():
+        reload_data()
 
 
 def update_post_metrics(state):
@@ -795,6 +719,7 @@ engagement_dashboard_layout = """# 📊 Account Engagement Overview
 <|Refresh data|button|class_name=btn-refresh|on_action=reload_data|>
 <|{refresh_status}|text|class_name=muted|>
 |>
+<|{table_sync_str}|text|class_name=muted|>
 
 <|layout|columns=1 1 1|gap=20px|class_name=metrics-grid|
 
@@ -818,9 +743,11 @@ engagement_dashboard_layout = """# 📊 Account Engagement Overview
 ---
 ## 📊 Growth Trends
 
-<|{account_data}|chart|type=line|x=Date|y[1]=Reach|y[2]=Lifetime Follower Count|title=Reach & Follower Growth|class_name=narrow|>
+<|{growth_chart_data}|chart|type=line|x=Date|y=Reach|decimator=reach_decimator|title=Reach Over Time|class_name=narrow|>
 
-<|{account_data}|chart|type=bar|x=Day|y=Reach|title=Reach by Day of Week|class_name=narrow|>
+<|{growth_chart_data}|chart|type=line|x=Date|y=Lifetime Follower Count|decimator=followers_decimator|title=Follower Growth|class_name=narrow|>
+
+<|{reach_by_day_data}|chart|type=bar|x=Day|y=Reach|title=Reach by Day of Week|class_name=narrow|>
 
 <|part|class_name=panel|
 ## 📈 Total Engagement Rate Over Time (All Posts)
@@ -828,7 +755,7 @@ engagement_dashboard_layout = """# 📊 Account Engagement Overview
 
 <|layout|columns=1 1 1|gap=10px|
 **Group by**
-<|{agg_granularity}|selector|lov=Day;Week|dropdown|on_change=_on_agg_change|>
+<|{agg_granularity}|selector|lov={agg_granularity_lov}|dropdown|on_change=_on_agg_change|>
 **Start date**
 <|{date_start}|date|on_change=_on_agg_change|>
 **End date**
@@ -846,6 +773,7 @@ post_performance_layout = """# 🎬 Post Performance Analysis
 <|Refresh data|button|class_name=btn-refresh|on_action=reload_data|>
 <|{refresh_status}|text|class_name=muted|>
 |>
+<|{table_sync_str}|text|class_name=muted|>
 
 <|layout|columns=1 1|gap=20px|class_name=metrics-grid|
 
@@ -864,7 +792,13 @@ post_performance_layout = """# 🎬 Post Performance Analysis
 ---
 ## 🔍 Individual Post Analysis
 **Select a Post:**
-<|{selected_post}|selector|lov={post_options}|dropdown|value_by_id=True|on_change=update_post_metrics|>
+<|layout|columns=1 auto auto auto|gap=10px|class_name=inline-controls|
+<|{post_query}|input|label=Search labels and hooks|change_delay=300|on_change=_on_post_query|>
+<|◀|button|on_action=prev_post_page|>
+<|{post_page_str}|text|class_name=muted|>
+<|▶|button|on_action=next_post_page|>
+|>
+<|{selected_post}|selector|lov={post_page_options}|dropdown|value_by_id=True|on_change=update_post_metrics|>
 
 <|layout|columns=1 1 1|gap=15px|class_name=metrics-grid|
 
@@ -902,12 +836,24 @@ post_performance_layout = """# 🎬 Post Performance Analysis
 ---
 ## 📈 Performance Trends
 *Engagement Rate = (Audience Comments + Likes + Saves) / Reach × 100*
-<|{posts_data}|chart|type=scatter|mode=lines+markers|x=Timestamp|y=Engagement Rate|title=Engagement Rate Over Time|class_name=narrow|>
+<|{engagement_chart_data}|chart|type=scatter|mode=lines+markers|x=Timestamp|y=Engagement Rate|decimator=engagement_decimator|title=Engagement Rate Over Time|class_name=narrow|>
 
 ---
 ## 🏆 Top 5 Performers
 *Engagement Rate = (Audience Comments + Likes + Saves) / Reach × 100*
-<|{posts_data.nlargest(5, 'Engagement Rate')[['Display Label', 'Likes Count', 'Reach', 'Saves', 'Audience Comments Count', 'Engagement Rate']] if 'Engagement Rate' in posts_data.columns else pd.DataFrame()}|table|>
+
+<|layout|columns=1 1 1 1|gap=10px|
+**Rank by**
+<|{top_metric}|selector|lov={top_metric_lov}|dropdown|on_change=_on_top_change|>
+**Content type**
+<|{top_content_type}|selector|lov={top_content_type_lov}|dropdown|on_change=_on_top_change|>
+**Start date**
+<|{top_date_start}|date|on_change=_on_top_change|>
+**End date**
+<|{top_date_end}|date|on_change=_on_top_change|>
+|>
+
+<|{top_posts}|table|>
 """
 
 content_efficiency_layout = """# ⚙️ Content Efficiency Dashboard
@@ -931,6 +877,8 @@ semantics_layout = """# 💬 Semantics: Hook Word Cloud (Engagement-Weighted)
 
 |>
 
+<|{hook_wordcloud_status}|text|class_name=muted|>
+
 <|layout|columns=5 3|gap=20px|
 <|{hook_wordcloud_path}|image|width=100%|>
 <||>
@@ -952,8 +900,13 @@ pages = {
 }
 
 if __name__ == "__main__":
+    start_data_load()
     port = int(os.environ.get("PORT", 8080))
-    app = Gui(pages=pages, css_file="style.css")
+    # Word-cloud PNGs are served from the in-memory render cache
+    flask_app = Flask(__name__)
+    flask_app.register_blueprint(WORDCLOUD_CACHE.blueprint())
+    app = Gui(pages=pages, css_file="style.css", flask=flask_app)
+    SCHEDULER.start()
 
     app.run(
         title="Malugo Analytics ✨",
@@ -0,0 +1,51 @@
+import unicodedata
+
+from data.hook_nlp import _strip_emojis
+
+
+def _original_strip_emojis(text: str) -> str:
+    # The per-character loop _strip_emojis replaced, kept verbatim as the reference
+    if not isinstance(text, str) or not text:
+        return ""
+    out = []
+    for ch in text:
+        cp = ord(ch)
+        if (
+            0x1F300 <= cp <= 0x1FAFF
+            or 0x2600 <= cp <= 0x26FF
+            or 0x2700 <= cp <= 0x27BF
+            or 0xFE00 <= cp <= 0xFE0F
+            or 0x1F1E6 <= cp <= 0x1F1FF
+            or cp == 0x200D
+        ):
+            continue
+        if unicodedata.category(ch) == "So":
+            continue
+        out.append(ch)
+    return "".join(out)
+
+
+CAPTIONS = [
+    "Você sabia? ❤️🔥 salva esse post 👇",
+    "família 👨‍👩‍👧 e amigos 🧑🏻‍🤝‍🧑🏾 juntos",  # ZWJ sequences with skin tones
+    "☀️ bom dia ✅ ⭐ ➡️ link na bio",  # variation selectors after BMP symbols
+    "🇧🇷 x 🇺🇸 — placar: 2×1 © ™ ® ½",
+    "keycap 1️⃣ #️⃣ arrows ↗ ⬆ ⤴ math ∑ ≤ ∞",
+    "plain ASCII text, nothing to strip",
+    "",
+]
+
+
+def test_strip_emojis_matches_original_loop():
+    for text in CAPTIONS:
+        assert _strip_emojis(text) == _original_strip_emojis(text), text
+
+
+def test_strip_emojis_matches_original_loop_on_every_codepoint():
+    text = "".join(chr(cp) for cp in range(0x110000) if not 0xD800 <= cp <= 0xDFFF)
+    assert _strip_emojis(text) == _original_strip_emojis(text)
+
+
+def test_strip_emojis_non_text():
+    assert _strip_emojis(None) == ""
+    assert _strip_emojis(float("nan")) == ""
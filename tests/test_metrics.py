@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from data.metrics import add_post_kpis, calculate_engagement_rate
+
+COUNTS = ["Likes Count", "Audience Comments Count", "Saves", "Reach"]
+
+
+def test_engagement_rate_matches_reference_rounding():
+    rng = np.random.default_rng(0)
+    rows = 200_000
+    df = pd.DataFrame({
+        "Likes Count": rng.integers(0, 2_000, rows),
+        "Audience Comments Count": rng.integers(0, 200, rows),
+        "Saves": rng.integers(0, 300, rows),
+        "Reach": rng.integers(0, 20_000, rows),
+    })
+    expected = [calculate_engagement_rate(row) for row in df[COUNTS].to_dict("records")]
+    assert add_post_kpis(df)["Engagement Rate"].tolist() == expected
+
+
+def test_engagement_rate_ties_and_missing_reach():
+    # 1/8 = 0.125 exactly: round() keeps half-to-even on the exact value
+    df = pd.DataFrame({
+        "Likes Count": pd.array([1, 5, 3, 7], dtype="Int32"),
+        "Audience Comments Count": pd.array([0, None, 0, 0], dtype="Int32"),
+        "Saves": pd.array([0, 0, 0, 0], dtype="Int32"),
+        "Reach": pd.array([800, 0, None, 2000], dtype="Int32"),
+    })
+    expected = [calculate_engagement_rate(row) for row in df[COUNTS].to_dict("records")]
+    assert add_post_kpis(df)["Engagement Rate"].tolist() == expected